@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Accuracy vs Speed Sweep
+Replays labelled clips through HandDetection under a grid of settings and
+reports latency next to finger-count and touch accuracy, marking the
+Pareto-optimal settings, to pick detection profiles from data.
+
+The label file lists clips as frame source specs with one entry per frame:
+
+    {"clips": [
+        {"source": "video:clips/count_and_touch.mp4",
+         "widgets": "widgets.json",
+         "frames": [{"fingers": 0}, {"fingers": 5}, {"fingers": 1, "touched": "green"}, null]}
+    ]}
+
+"fingers" is the expected total finger count (detection_data["fingers_count"]),
+"touched" the expected touched button, or null for none (detection_data
+["touched_button"]); either key may be left out and null entries are not
+scored. Labels are in the mirrored view that process_frame shows. "widgets"
+is optional and defaults to the default buttons.
+
+    python accuracy_sweep.py clips.json --scales 1.0 0.5 --complexity 0 1 --skip 1 3
+"""
+
+import argparse
+import itertools
+import json
+import time
+
+import cv2
+import numpy as np
+
+from frameSource import create_frame_source
+from handDetection import DEFAULT_PROFILE, PROFILES, HandDetection
+from widgetRegistry import load_widgets
+
+
+def load_clips(path):
+    """Clips with their frames decoded into memory, so replay measures only detection"""
+    with open(path) as f:
+        clips = json.load(f)["clips"]
+    for clip in clips:
+        source = create_frame_source(clip["source"], pacing="fast")
+        frames = []
+        try:
+            while len(frames) < len(clip["frames"]):
+                frame = source.get_frame()
+                if frame is None:
+                    break
+                frames.append(frame.copy())
+        finally:
+            source.release()
+        if len(frames) < len(clip["frames"]):
+            print(f"⚠️  {clip['source']} has {len(frames)} frames, {len(clip['frames'])} labelled")
+        clip["images"] = frames
+        clip["widget_list"] = load_widgets(clip.get("widgets"))
+    return clips
+
+
+def settings_grid(args):
+    """One settings dict per combination of the swept values"""
+    grid = itertools.product(args.scales, args.complexity, args.detection_confidence,
+                             args.tracking_confidence, args.skip)
+    return [
+        {"inference_scale": scale, "model_complexity": complexity, "min_detection_confidence": detection,
+         "min_tracking_confidence": tracking, "skip": skip}
+        for scale, complexity, detection, tracking, skip in grid
+    ]
+
+
+def settings_name(settings):
+    return (f"scale={settings['inference_scale']:g} complexity={settings['model_complexity']} "
+            f"det={settings['min_detection_confidence']:g} track={settings['min_tracking_confidence']:g} "
+            f"skip={settings['skip']}")
+
+
+def create_detector(settings, widgets, max_num_hands, render):
+    # The swept Hands options are registered as a profile, the same way the
+    # named profiles reach the MediaPipe graph
+    profile = f"sweep:{settings_name(settings)}"
+    PROFILES[profile] = {
+        **PROFILES[DEFAULT_PROFILE],
+        "max_num_hands": max_num_hands,
+        "model_complexity": settings["model_complexity"],
+        "min_detection_confidence": settings["min_detection_confidence"],
+        "min_tracking_confidence": settings["min_tracking_confidence"],
+    }
+    # Frame skipping is detect-then-track: skip=N runs full inference at
+    # most every N frames and follows the hands with optical flow in between
+    return HandDetection(
+        headless=not render,
+        tracking=settings["skip"] > 1,
+        max_tracking_interval=settings["skip"],
+        inference_scale=settings["inference_scale"],
+        widgets=widgets,
+        profile=profile,
+    )
+
+
+def run_settings(settings, clips, max_num_hands, render):
+    latencies = []
+    finger_hits = finger_total = 0
+    finger_errors = []
+    touch_hits = touch_total = false_touches = 0
+
+    for clip in clips:
+        detector = create_detector(settings, clip["widget_list"], max_num_hands, render)
+        try:
+            for frame, label in zip(clip["images"], clip["frames"]):
+                start = time.perf_counter()
+                _, detection_data = detector.process_frame(frame)
+                latencies.append(time.perf_counter() - start)
+                if label is None:
+                    continue
+
+                if label.get("fingers") is not None:
+                    error = abs(detection_data["fingers_count"] - label["fingers"])
+                    finger_errors.append(error)
+                    finger_hits += error == 0
+                    finger_total += 1
+
+                if "touched" in label:
+                    touched = detection_data.get("touched_button")
+                    touch_hits += touched == label["touched"]
+                    false_touches += touched is not None and touched != label["touched"]
+                    touch_total += 1
+        finally:
+            detector.close()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "settings": settings,
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies_ms, 50)), 2),
+            "p95": round(float(np.percentile(latencies_ms, 95)), 2),
+            "mean": round(float(latencies_ms.mean()), 2),
+        },
+        "finger_accuracy": round(finger_hits / finger_total, 4) if finger_total else None,
+        "finger_mae": round(float(np.mean(finger_errors)), 3) if finger_errors else None,
+        "touch_accuracy": round(touch_hits / touch_total, 4) if touch_total else None,
+        "false_touch_rate": round(false_touches / touch_total, 4) if touch_total else None,
+    }
+
+
+def pareto_frontier(results):
+    """Indices of results no other result beats on p95 latency and both accuracies at once"""
+    def objectives(result):
+        # Higher is better for every objective, unlabelled accuracies count as equal
+        return (-result["latency_ms"]["p95"], result["finger_accuracy"] or 0.0, result["touch_accuracy"] or 0.0)
+
+    points = [objectives(result) for result in results]
+    frontier = []
+    for i, point in enumerate(points):
+        dominated = any(
+            all(o >= p for o, p in zip(other, point)) and other != point
+            for j, other in enumerate(points) if j != i
+        )
+        if not dominated:
+            frontier.append(i)
+    return frontier
+
+
+def format_accuracy(value):
+    return "   -  " if value is None else f"{value * 100:5.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep detection settings against labelled clips")
+    parser.add_argument("labels", help="JSON file listing the labelled clips")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 0.75, 0.5],
+                        help="MediaPipe input size as a fraction of the frame")
+    parser.add_argument("--complexity", type=int, nargs="+", default=[0, 1], help="model_complexity values")
+    parser.add_argument("--detection-confidence", type=float, nargs="+", default=[0.5, 0.7])
+    parser.add_argument("--tracking-confidence", type=float, nargs="+", default=[0.5])
+    parser.add_argument("--skip", type=int, nargs="+", default=[1, 3, 6],
+                        help="frames per full inference (1 = every frame, >1 tracks in between)")
+    parser.add_argument("--max-hands", type=int, default=2)
+    parser.add_argument("--render", action="store_true", help="include overlay drawing in the latency")
+    parser.add_argument("--output", help="write all results to this JSON file")
+    args = parser.parse_args()
+
+    clips = load_clips(args.labels)
+    grid = settings_grid(args)
+    total_frames = sum(len(clip["images"]) for clip in clips)
+    print(f"🎯 Sweeping {len(grid)} settings over {len(clips)} clips ({total_frames} frames), "
+          f"OpenCV {cv2.__version__}")
+
+    results = []
+    for i, settings in enumerate(grid, 1):
+        print(f"  [{i}/{len(grid)}] {settings_name(settings)}")
+        results.append(run_settings(settings, clips, args.max_hands, args.render))
+
+    frontier = set(pareto_frontier(results))
+    for i, result in enumerate(results):
+        result["pareto"] = i in frontier
+
+    print("-" * 100)
+    print(f"{'settings':52s} {'p50 ms':>7s} {'p95 ms':>7s} {'fingers':>7s} {'MAE':>6s} {'touch':>7s} {'false':>7s}")
+    for result in sorted(results, key=lambda r: r["latency_ms"]["p95"]):
+        mae = "   -  " if result["finger_mae"] is None else f"{result['finger_mae']:6.3f}"
+        print(f"{'⭐' if result['pareto'] else '  '}{settings_name(result['settings']):50s} "
+              f"{result['latency_ms']['p50']:7.2f} {result['latency_ms']['p95']:7.2f} "
+              f"{format_accuracy(result['finger_accuracy']):>7s} {mae} "
+              f"{format_accuracy(result['touch_accuracy']):>7s} {format_accuracy(result['false_touch_rate']):>7s}")
+    print(f"⭐ Pareto frontier (p95 latency vs finger and touch accuracy): {len(frontier)} of {len(results)} settings")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"labels": args.labels, "results": results}, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
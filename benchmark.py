@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Offline Pipeline Benchmark Suite
+Runs the detection and streaming pipeline on a clip or generated frames,
+without a camera, and writes the results as JSON. With --baseline the run
+is compared against a stored result and exits non-zero on a regression.
+
+    python benchmark.py --output bench.json
+    python benchmark.py --source video:clip.mp4 --baseline baseline.json
+    python benchmark.py --output baseline.json   # store a new baseline
+"""
+
+import argparse
+import base64
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from frameSource import create_frame_source
+
+
+def load_frames(spec, count, width, height):
+    """First `count` frames of a frame source, resized to width x height"""
+    source = create_frame_source(spec, pacing="fast")
+    frames = []
+    try:
+        while len(frames) < count:
+            frame = source.get_frame()
+            if frame is None:
+                break
+            if frame.shape[:2] != (height, width):
+                frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            frames.append(np.ascontiguousarray(frame))
+    finally:
+        source.release()
+    if not frames:
+        raise RuntimeError(f"No frames from {spec}")
+    return frames
+
+
+def summarize(samples):
+    """p50/p95/p99/mean in milliseconds"""
+    values = np.percentile(samples, [50, 95, 99]) * 1000
+    return {
+        "p50": round(float(values[0]), 3),
+        "p95": round(float(values[1]), 3),
+        "p99": round(float(values[2]), 3),
+        "mean": round(float(np.mean(samples)) * 1000, 3),
+    }
+
+
+def run_detectors(detectors, frames, iterations):
+    """Process `iterations` frames on every detector in parallel threads, returns total fps"""
+    barrier = threading.Barrier(len(detectors) + 1)
+
+    def worker(detector):
+        barrier.wait()
+        for i in range(iterations):
+            detector.process_frame(frames[i % len(frames)])
+
+    threads = [threading.Thread(target=worker, args=(detector,)) for detector in detectors]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return round(len(detectors) * iterations / (time.perf_counter() - start), 2)
+
+
+def bench_processes(frames, max_workers, iterations, options):
+    """Throughput with 1..max_workers DetectionEngine worker processes"""
+    from detectionEngine import DetectionEngine
+
+    results = {}
+    for workers in range(1, max_workers + 1):
+        h, w = frames[0].shape[:2]
+        engine = DetectionEngine(num_workers=workers, max_frame_shape=(h, w, 3))
+        try:
+            detectors = [engine.create_detector(**options) for _ in range(workers)]
+            run_detectors(detectors, frames, min(10, iterations))
+            results[str(workers)] = run_detectors(detectors, frames, iterations)
+        finally:
+            engine.close()
+        print(f"  {workers} processes: {results[str(workers)]} fps")
+    return results
+
+
+def bench_threads(frames, max_threads, iterations, options):
+    """Throughput with 1..max_threads in-process detectors, one thread each"""
+    from handDetection import HandDetection
+
+    results = {}
+    for threads in range(1, max_threads + 1):
+        detectors = [HandDetection(**options) for _ in range(threads)]
+        try:
+            run_detectors(detectors, frames, min(10, iterations))
+            results[str(threads)] = run_detectors(detectors, frames, iterations)
+        finally:
+            for detector in detectors:
+                detector.close()
+        print(f"  {threads} threads: {results[str(threads)]} fps")
+    return results
+
+
+def bench_latency(frames, iterations, options):
+    """Per-call HandDetection.process_frame latency on one detector"""
+    from handDetection import HandDetection
+
+    detector = HandDetection(**options)
+    try:
+        for frame in frames[:10]:
+            detector.process_frame(frame)
+        samples = []
+        for i in range(iterations):
+            start = time.perf_counter()
+            detector.process_frame(frames[i % len(frames)])
+            samples.append(time.perf_counter() - start)
+    finally:
+        detector.close()
+    return summarize(samples)
+
+
+def bench_jpeg(frames, iterations):
+    """imencode cost at the camera stream (50) and client frame (90) qualities, plus base64 for data: URL uploads"""
+    results = {}
+    for quality in (50, 90):
+        samples = []
+        for i in range(iterations):
+            start = time.perf_counter()
+            cv2.imencode('.jpg', frames[i % len(frames)], [cv2.IMWRITE_JPEG_QUALITY, quality])
+            samples.append(time.perf_counter() - start)
+        results[f"encode_q{quality}"] = summarize(samples)
+
+    _, buffer = cv2.imencode('.jpg', frames[0], [cv2.IMWRITE_JPEG_QUALITY, 50])
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        base64.b64encode(buffer).decode('utf-8')
+        samples.append(time.perf_counter() - start)
+    results["base64"] = summarize(samples)
+    return results
+
+
+def bench_end_to_end(spec, iterations, options):
+    """Frames per second through the same steps as server.camera_stream"""
+    from handDetection import HandDetection
+
+    source = create_frame_source(spec, pacing="fast")
+    detector = HandDetection(**options)
+    processed = 0
+    try:
+        start = time.perf_counter()
+        last_seq = 0
+        while processed < iterations:
+            lease = source.wait_for_frame(last_seq, timeout=1.0)
+            if lease is None:
+                if not source.is_opened():
+                    break
+                continue
+            last_seq = lease.seq
+            with lease:
+                processed_frame, detection_data = detector.process_frame(lease.frame)
+            ret, buffer = cv2.imencode('.jpg', processed_frame, [cv2.IMWRITE_JPEG_QUALITY, 50])
+            if ret:
+                # Socket.IO sends the JPEG as a binary attachment next to the JSON
+                json.dumps({"camera": 0, "image": {"_placeholder": True, "num": 0}, "detection_data": detection_data})
+                buffer.tobytes()
+            processed += 1
+        elapsed = time.perf_counter() - start
+    finally:
+        detector.close()
+        source.release()
+    return round(processed / elapsed, 2)
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return {"self": round(own / 1e6, 1), "worker_processes": round(children / 1e6, 1)}
+
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+# Only these fail a run when they regress, the rest is reported for context:
+# tail percentiles of short timings and sub-millisecond stages are too noisy
+GATED_METRICS = ("process_frame_ms.p95", "end_to_end_fps", "throughput_threads_fps.", "throughput_processes_fps.")
+
+
+def is_gated(name):
+    return any(name == metric or (metric.endswith(".") and name.startswith(metric)) for metric in GATED_METRICS)
+
+
+def compare(results, baseline, threshold, min_delta):
+    """Gated metrics worse than the baseline by more than `threshold` (a fraction)
+    and by more than `min_delta` (ms or fps), plus baseline metrics this run lacks"""
+    current = flatten(results)
+    regressions = []
+    missing = []
+    for name, old in flatten(baseline).items():
+        new = current.get(name)
+        if new is None:
+            missing.append(name)
+            continue
+        if not old:
+            continue
+        change = (new - old) / old
+        # Throughput is better when higher, times and memory when lower
+        higher_is_better = "fps" in name or name.startswith("throughput")
+        worse = -change if higher_is_better else change
+        regressed = is_gated(name) and worse > threshold and abs(new - old) > min_delta
+        status = "❌" if regressed else ("  " if is_gated(name) else " ·")
+        print(f"{status} {name:45s} {old:10.2f} -> {new:10.2f} ({change:+.1%})")
+        if regressed:
+            regressions.append(name)
+    return regressions, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the hand detection pipeline")
+    parser.add_argument("--source", default="synthetic",
+                        help='frame source spec (see config.FRAME_SOURCE), e.g. "video:clip.mp4"')
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--frames", type=int, default=60, help="frames loaded from the source")
+    parser.add_argument("--iterations", type=int, default=500, help="frames processed per measurement")
+    parser.add_argument("--max-workers", type=int, default=multiprocessing.cpu_count(),
+                        help="highest thread/process count measured")
+    parser.add_argument("--no-processes", action="store_true", help="skip the worker process benchmark")
+    parser.add_argument("--profile", default="balanced", help="detection profile (see handDetection.PROFILES)")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this results JSON file")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed regression against the baseline, as a fraction")
+    parser.add_argument("--min-delta", type=float, default=1.0,
+                        help="smallest absolute change (ms or fps) that counts as a regression")
+    args = parser.parse_args()
+
+    options = {"profile": args.profile}
+    frames = load_frames(args.source, args.frames, args.width, args.height)
+    print(f"⏱️  Benchmarking {len(frames)} frames from {args.source} at {args.width}x{args.height}")
+
+    results = {}
+    # Worker processes are forked, which is only safe before MediaPipe has
+    # run in this process, so they go first
+    if not args.no_processes:
+        print("🧠 Throughput with worker processes")
+        results["throughput_processes_fps"] = bench_processes(frames, args.max_workers, args.iterations, options)
+
+    print("🧵 Throughput with threads")
+    results["throughput_threads_fps"] = bench_threads(frames, args.max_workers, args.iterations, options)
+
+    print("🖐️  process_frame latency")
+    results["process_frame_ms"] = bench_latency(frames, args.iterations, options)
+    print(f"  {results['process_frame_ms']}")
+
+    print("🗜️  JPEG encode")
+    results["jpeg_ms"] = bench_jpeg(frames, args.iterations)
+    print(f"  {results['jpeg_ms']}")
+
+    print("🔁 End to end (camera_stream equivalent)")
+    results["end_to_end_fps"] = bench_end_to_end(args.source, args.iterations, options)
+    print(f"  {results['end_to_end_fps']} fps")
+
+    results["peak_rss_mb"] = peak_rss_mb()
+    print(f"💾 Peak RSS: {results['peak_rss_mb']}")
+
+    report = {
+        "meta": {
+            "source": args.source,
+            "resolution": [args.width, args.height],
+            "frames": len(frames),
+            "iterations": args.iterations,
+            "profile": args.profile,
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "machine": platform.machine(),
+            "cpus": multiprocessing.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print("-" * 40)
+        print(f"Comparing against {args.baseline} (threshold {args.threshold:.0%}, "
+              f"at least {args.min_delta:g} ms/fps, · = not gated)")
+        regressions, missing = compare(results, baseline["results"], args.threshold, args.min_delta)
+        if missing:
+            print(f"⚠️  {len(missing)} baseline metrics missing from this run: {', '.join(missing)}")
+        if regressions:
+            print(f"❌ {len(regressions)} metrics regressed: {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Frame Preprocessing Benchmark
+Compares the per-frame flip + BGR->RGB conversion before inference:
+allocating new arrays every frame, writing into reused buffers, and
+skipping the flip by mirroring landmarks instead.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+
+
+def allocating(frame, buffers):
+    flipped = cv2.flip(frame, 1)
+    return cv2.cvtColor(flipped, cv2.COLOR_BGR2RGB)
+
+
+def buffered(frame, buffers):
+    flipped = cv2.flip(frame, 1, dst=buffers["flip"])
+    return cv2.cvtColor(flipped, cv2.COLOR_BGR2RGB, dst=buffers["rgb"])
+
+
+def mirror_landmarks(frame, buffers):
+    # Inference runs on the camera frame, only x of 21 landmarks is mirrored
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=buffers["rgb"])
+
+
+MODES = [
+    ("allocate per frame", allocating),
+    ("reused buffers", buffered),
+    ("mirror landmarks", mirror_landmarks),
+]
+
+
+def measure(fn, frame, buffers, iterations):
+    """(seconds per frame, bytes allocated per frame)"""
+    fn(frame, buffers)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(frame, buffers)
+    elapsed = (time.perf_counter() - start) / iterations
+
+    # numpy reports its allocations (including OpenCV outputs) to tracemalloc
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    fn(frame, buffers)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark flip and color conversion before inference")
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"🖼️  Preprocessing per frame, {args.iterations} iterations, OpenCV {cv2.__version__}")
+    for width, height in RESOLUTIONS:
+        frame = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+        buffers = {"flip": np.empty_like(frame), "rgb": np.empty_like(frame)}
+
+        expected = allocating(frame, buffers)
+        if not np.array_equal(buffered(frame, buffers), expected):
+            print("❌ Buffered output differs from the allocating path")
+
+        print("-" * 60)
+        print(f"{width}x{height}")
+        reference = None
+        for name, fn in MODES:
+            elapsed, allocated = measure(fn, frame, buffers, args.iterations)
+            reference = reference or elapsed
+            print(f"  {name:20s} {elapsed * 1000:7.3f} ms  {allocated / 1e6:7.2f} MB allocated"
+                  f"  ({reference / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
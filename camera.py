@@ -3,20 +3,34 @@ import numpy as np
 import time
 import threading
 
+from frameBuffer import FrameRingBuffer
+
 class Camera:
-    def __init__(self):
-        self.camera_index = 0
+    def __init__(self, camera_index=0, num_slots=4, raw_mjpeg=False):
+        self.camera_index = camera_index
         self.cap = None
-        self.latest_frame = None
-        self.frame_lock = threading.Lock()
+        # Keep compressed MJPEG bytes and let consumers decode on demand
+        self.request_raw_mjpeg = raw_mjpeg
+        self.raw_mjpeg = False
+        # Preallocated frames, written in place by the capture thread
+        self.frame_buffer = FrameRingBuffer(num_slots=num_slots, shape=(480, 640, 3))
+        # Ring of JPEG byte slots, allocated the first time raw mode works
+        self.raw_buffer = None
         self.capture_thread = None
-        self.capturing = False
+        # Set to stop the current capture thread, every thread gets its own
+        self.capture_stop = None
+        self.recorder = None
         self.init_camera()
 
     def init_camera(self):
         """Initialize camera with proper error handling and RPi optimizations"""
         print("🎥 Opening camera...")
-        
+
+        # A reopen must not leave the previous capture thread writing into the ring
+        self.stop_capture_thread()
+        if self.cap is not None:
+            self.cap.release()
+
         self.cap = cv.VideoCapture(self.camera_index)
         if not self.cap.isOpened():
             print("❌ Failed to open camera")
@@ -35,7 +49,24 @@ class Camera:
         # Try to use hardware acceleration
         self.cap.set(cv.CAP_PROP_FOURCC, cv.VideoWriter_fourcc('M', 'J', 'P', 'G'))
 
+        # Raw mode skips OpenCV's per-frame decode, the ring then holds JPEG bytes
+        self.raw_mjpeg = False
+        if self.request_raw_mjpeg:
+            self.raw_mjpeg = bool(self.cap.set(cv.CAP_PROP_FORMAT, -1))
+            if self.raw_mjpeg:
+                if self.raw_buffer is None:
+                    self.raw_buffer = FrameRingBuffer(num_slots=self.frame_buffer.num_slots, shape=(640 * 480,))
+                # Keep counting where the previous ring stopped, consumers wait
+                # for frames newer than the last seq they saw
+                if self.raw_buffer is not self.frame_buffer:
+                    self.raw_buffer.seq = max(self.raw_buffer.seq, self.frame_buffer.seq)
+                    self.frame_buffer = self.raw_buffer
+                print("🗜️  Capturing raw MJPEG, frames are decoded on demand")
+            else:
+                print("⚠️  Raw MJPEG capture not supported by this backend, decoding every frame")
+
         # Start continuous capture thread
+        self.frame_buffer.reset()
         self.start_capture_thread()
 
         print("✅ Camera opened successfully")
@@ -43,25 +74,110 @@ class Camera:
 
     def start_capture_thread(self):
         """Start a separate thread for continuous frame capture"""
-        self.capturing = True
-        self.capture_thread = threading.Thread(target=self._capture_frames, daemon=True)
+        self.capture_stop = threading.Event()
+        self.capture_thread = threading.Thread(target=self._capture_frames,
+                                               args=(self.capture_stop, self.cap, self.frame_buffer), daemon=True)
         self.capture_thread.start()
 
-    def _capture_frames(self):
-        """Continuously capture frames in a separate thread"""
-        while self.capturing and self.cap is not None:
-            ret, frame = self.cap.read()
-            if ret and frame is not None:
-                with self.frame_lock:
-                    self.latest_frame = frame.copy()
+    def stop_capture_thread(self):
+        """Stop the capture thread and wait for it to finish its current frame.
+
+        A read on a failing device can block longer than the join waits; the
+        thread then still exits after that read, without publishing it.
+        """
+        if self.capture_stop is not None:
+            self.capture_stop.set()
+            self.capture_stop = None
+        if (self.capture_thread and self.capture_thread.is_alive()
+                and self.capture_thread is not threading.current_thread()):
+            self.capture_thread.join(timeout=1.0)
+        self.capture_thread = None
+
+    def _capture_frames(self, stop, cap, ring):
+        """Continuously capture frames from cap into ring until stop is set"""
+        while not stop.is_set():
+            index, slot = ring.acquire_write_slot()
+            if index is None:
+                # Every free slot is borrowed - drain the device and drop this frame
+                cap.grab()
+                continue
+
+            if self.raw_mjpeg:
+                self._capture_raw(stop, cap, ring, index, slot)
+                continue
+
+            # Decode straight into the preallocated slot, no per-frame allocation
+            ret, frame = cap.read(image=slot)
+            if ret and frame is not None and not stop.is_set():
+                ring.commit(index, time.time(), frame)
+            else:
+                ring.abort(index)
             # No sleep - capture as fast as possible
 
+    def _capture_raw(self, stop, cap, ring, index, slot):
+        """Store one compressed MJPEG frame in a ring slot without decoding it"""
+        ret, data = cap.read()
+        if not ret or data is None or stop.is_set():
+            ring.abort(index)
+            return
+
+        if data.ndim == 3:
+            # The backend decoded anyway, fall back to regular BGR slots
+            print("⚠️  Backend returned decoded frames, leaving raw MJPEG mode")
+            self.raw_mjpeg = False
+            ring.commit(index, time.time(), data)
+            return
+
+        # Compressed frames vary in size, copy the few KB into the slot and
+        # grow it once if a frame doesn't fit
+        nbytes = data.size
+        if nbytes > slot.size:
+            slot = np.empty(nbytes * 2, dtype=np.uint8)
+        slot[:nbytes] = data.reshape(-1)
+        ring.commit(index, time.time(), slot, nbytes=nbytes)
+
+    def borrow_frame(self):
+        """Borrow the latest frame without copying (non-blocking).
+
+        Returns a FrameLease whose .frame is a read-only view, or None.
+        The slot stays pinned until lease.release() is called, so release
+        it as soon as processing is done (or use it as a context manager).
+        """
+        return self.frame_buffer.borrow()
+
+    def wait_for_frame(self, after_seq=0, timeout=1.0):
+        """Block until a frame newer than after_seq is captured and borrow it.
+
+        Returns a FrameLease (.frame, .seq, .timestamp) or None on timeout.
+        Pass the previous lease's seq to get each camera frame exactly once.
+        """
+        return self.frame_buffer.wait_for(after_seq, timeout)
+
     def get_frame(self):
-        """Get the latest frame (non-blocking)"""
-        with self.frame_lock:
-            if self.latest_frame is not None:
-                return self.latest_frame.copy()
-        return None
+        """Get a private copy of the latest frame (non-blocking)"""
+        lease = self.frame_buffer.borrow()
+        if lease is None:
+            return None
+        with lease:
+            # JPEG slots are decoded into a fresh array already
+            return lease.frame.copy() if lease.jpeg is None else lease.frame
+
+    def start_recording(self, path):
+        """Record captured frames and timestamps to a frame store file (see frameStore.py)"""
+        from frameStore import CameraRecorder
+        self.stop_recording()
+        self.recorder = CameraRecorder(self, path)
+        return self.recorder
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.stop()
+            self.recorder = None
+
+    @property
+    def dropped_frames(self):
+        """Frames dropped because every ring slot was borrowed"""
+        return self.frame_buffer.dropped
 
     def is_opened(self):
         """Check if the camera is opened"""
@@ -77,9 +193,8 @@ class Camera:
 
     def release(self):
         """Release camera resources"""
-        self.capturing = False
-        if self.capture_thread and self.capture_thread.is_alive():
-            self.capture_thread.join(timeout=1.0)
+        self.stop_recording()
+        self.stop_capture_thread()
         
         if self.cap is not None:
             self.cap.release()
@@ -0,0 +1,100 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from frameSource import create_frame_source
+from sessionPool import GraphPool
+
+
+class CameraStats:
+    """Per-camera processed fps and dropped frame counters"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.dropped = 0
+        self.fps = 0.0
+        self._window_start = None
+        self._window_frames = 0
+
+    def record(self, skipped=0):
+        """Count one processed frame and the camera frames skipped before it"""
+        with self.lock:
+            self.processed += 1
+            self.dropped += skipped
+            now = time.monotonic()
+            if self._window_start is None:
+                self._window_start = now
+            self._window_frames += 1
+            elapsed = now - self._window_start
+            if elapsed >= 1.0:
+                self.fps = self._window_frames / elapsed
+                self._window_start += elapsed
+                self._window_frames = 0
+
+    def snapshot(self):
+        with self.lock:
+            return {"fps": round(self.fps, 1), "processed": self.processed, "dropped": self.dropped}
+
+
+class CameraPool:
+    """Several frame sources, each with its own hand detector.
+
+    Each camera.Camera runs its own capture thread; consumers pull frames
+    per camera with wait_for_frame() and run them through detector(camera_id).
+    A detector holds its camera's button, touch and hand state and its
+    tracking, so it is never used for another camera. With fewer graphs
+    (num_detectors) than cameras the detectors share their MediaPipe graphs
+    through a sessionPool.GraphPool, which resets a graph that changes camera.
+    """
+
+    def __init__(self, specs, detector_factory, num_detectors=None, graph_factory=None,
+                 pacing="realtime", raw_mjpeg=False):
+        self.cameras = {}
+        for camera_id, spec in enumerate(specs):
+            try:
+                self.cameras[camera_id] = create_frame_source(spec, pacing, raw_mjpeg=raw_mjpeg)
+            except Exception as e:
+                print(f"❌ Could not open frame source {spec}: {e}")
+        self.graphs = None
+        if num_detectors is not None and num_detectors < len(self.cameras):
+            if graph_factory is None:
+                raise ValueError(f"{len(self.cameras)} cameras need {len(self.cameras)} detectors, "
+                                 f"or a graph_factory to share {num_detectors} graphs")
+            self.graphs = GraphPool(graph_factory, size=num_detectors)
+        # detector_factory(camera_id, hands_pool) -> HandDetection
+        self.detectors = {camera_id: detector_factory(camera_id, self.graphs) for camera_id in self.cameras}
+        # A restarted stream thread may overlap the one it replaces for a frame
+        self.detector_locks = {camera_id: threading.Lock() for camera_id in self.cameras}
+        self.stats = {camera_id: CameraStats() for camera_id in self.cameras}
+        graphs = len(self.cameras) if self.graphs is None else self.graphs.size
+        print(f"📷 Camera pool: {len(self.cameras)} sources, {graphs} detection graphs")
+
+    def camera(self, camera_id):
+        return self.cameras.get(camera_id)
+
+    @contextmanager
+    def detector(self, camera_id):
+        """The camera's detector, used by one thread at a time"""
+        with self.detector_locks[camera_id]:
+            yield self.detectors[camera_id]
+
+    def stats_snapshot(self):
+        snapshot = {}
+        for camera_id, stats in self.stats.items():
+            snapshot[camera_id] = stats.snapshot()
+            # Frames the capture thread had to drop because every ring slot was borrowed
+            snapshot[camera_id]["capture_dropped"] = getattr(self.cameras[camera_id], "dropped_frames", 0)
+            # Inference skipped by the motion gate of the camera's detector
+            detector = self.detectors.get(camera_id)
+            if detector is not None and getattr(detector, "motion_gate", None) is not None:
+                snapshot[camera_id].update(detector.motion_gate.stats())
+        return snapshot
+
+    def release(self):
+        for camera in self.cameras.values():
+            camera.release()
+        for detector in self.detectors.values():
+            detector.close()
+        if self.graphs is not None:
+            self.graphs.close()
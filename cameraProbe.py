@@ -0,0 +1,148 @@
+import cv2 as cv
+import json
+import os
+import time
+
+import config
+
+
+# Backends in the order a full probe tries them
+BACKENDS = [
+    ("GStreamer", cv.CAP_GSTREAMER),
+    ("FFmpeg", cv.CAP_FFMPEG),
+    ("CAP_ANY", cv.CAP_ANY),
+    ("V4L2", cv.CAP_V4L2),
+]
+BACKEND_IDS = dict(BACKENDS)
+
+# Pixel formats tried per backend, None keeps the driver default
+FOURCCS = ["MJPG", None]
+
+
+def _device_key(camera_index):
+    """Cache key for a device, includes the V4L2 name so swapped cameras miss"""
+    name = ""
+    try:
+        with open(f"/sys/class/video4linux/video{camera_index}/name") as f:
+            name = f.read().strip()
+    except OSError:
+        pass
+    return f"{camera_index}:{name}" if name else str(camera_index)
+
+
+def load_cache(path=None):
+    path = path or config.CAMERA_PROBE_CACHE
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache, path=None):
+    path = path or config.CAMERA_PROBE_CACHE
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️  Could not write camera probe cache {path}: {e}")
+
+
+def try_open(camera_index, backend_name, fourcc=None, width=640, height=480,
+             open_timeout=2.0, read_timeout=1.0):
+    """Open one backend/FOURCC combination and wait briefly for a first frame.
+
+    Returns (cap, frame, opened): cap and frame are None on failure and
+    opened tells whether the backend could open the device at all. Instead
+    of fixed sleeps, frames are polled until read_timeout expires.
+    """
+    backend = BACKEND_IDS[backend_name]
+    params = []
+    if hasattr(cv, "CAP_PROP_OPEN_TIMEOUT_MSEC"):
+        params = [
+            cv.CAP_PROP_OPEN_TIMEOUT_MSEC, int(open_timeout * 1000),
+            cv.CAP_PROP_READ_TIMEOUT_MSEC, int(read_timeout * 1000),
+        ]
+
+    cap = None
+    try:
+        cap = cv.VideoCapture(camera_index, backend, params)
+        if not cap.isOpened():
+            cap.release()
+            return None, None, False
+
+        cap.set(cv.CAP_PROP_BUFFERSIZE, 1)
+        if fourcc:
+            cap.set(cv.CAP_PROP_FOURCC, cv.VideoWriter_fourcc(*fourcc))
+        cap.set(cv.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv.CAP_PROP_FRAME_HEIGHT, height)
+
+        deadline = time.monotonic() + read_timeout
+        while True:
+            ret, frame = cap.read()
+            if ret and frame is not None:
+                return cap, frame, True
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(0.05)
+    except Exception as e:
+        print(f"❌ {backend_name} backend error: {e}")
+        if cap is not None:
+            cap.release()
+        return None, None, False
+
+    cap.release()
+    return None, None, True
+
+
+def open_camera(camera_index=0, width=640, height=480, cache_path=None):
+    """Open a camera, trying the cached winning configuration first.
+
+    Falls back to a full probe over BACKENDS x FOURCCS when there is no
+    cache entry or the cached one no longer works, and stores the winner
+    with the resolution the device actually delivered for width x height;
+    a cached open requests that resolution directly.
+    Returns (cap, frame, entry) or raises if nothing works.
+    """
+    cache = load_cache(cache_path)
+    key = _device_key(camera_index)
+
+    entry = cache.get(key)
+    if entry and entry.get("backend") in BACKEND_IDS and entry.get("requested") == [width, height]:
+        cached_width, cached_height = entry.get("resolution") or (width, height)
+        print(f"⚡ Trying cached {entry['backend']}/{entry.get('fourcc') or 'default'} "
+              f"at {cached_width}x{cached_height} for camera {key}")
+        cap, frame, _ = try_open(camera_index, entry["backend"], entry.get("fourcc"), cached_width, cached_height)
+        if cap is not None:
+            return cap, frame, entry
+        print("⚠️  Cached camera configuration is stale, running full probe")
+        del cache[key]
+    elif entry:
+        print("🔄 Cached camera configuration is for another resolution, running full probe")
+
+    for backend_name, _ in BACKENDS:
+        for fourcc in FOURCCS:
+            print(f"🔍 Trying {backend_name} backend ({fourcc or 'default'} format)...")
+            cap, frame, opened = try_open(camera_index, backend_name, fourcc, width, height)
+            if cap is None:
+                if not opened:
+                    # The backend can't open the device, other formats won't help
+                    break
+                continue
+
+            entry = {
+                "backend": backend_name,
+                "fourcc": fourcc,
+                "requested": [width, height],
+                "resolution": [int(v) for v in frame.shape[1::-1]],
+                "probed_at": time.time(),
+            }
+            cache[key] = entry
+            save_cache(cache, cache_path)
+            return cap, frame, entry
+
+    save_cache(cache, cache_path)
+    raise Exception("All camera backends failed")
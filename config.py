@@ -0,0 +1,96 @@
+import os
+
+# Where frames come from: "camera", "camera:<index>", "video:<path>",
+# "images:<directory>", "replay:<frame store>" or "synthetic". Separate
+# several sources with commas to stream multiple cameras, e.g.
+# "camera:0,camera:2"
+FRAME_SOURCE = os.environ.get("FRAME_SOURCE", "camera")
+FRAME_SOURCES = [spec.strip() for spec in FRAME_SOURCE.split(",") if spec.strip()]
+
+# Every camera has its own hand detector; with fewer DETECTOR_WORKERS than
+# cameras they share that many MediaPipe graphs. Defaults to one per camera
+DETECTOR_WORKERS = int(os.environ.get("DETECTOR_WORKERS", 0)) or None
+
+# "realtime" plays file/synthetic sources at their native fps,
+# "fast" feeds frames as fast as the pipeline can take them
+FRAME_SOURCE_PACING = os.environ.get("FRAME_SOURCE_PACING", "realtime")
+
+# Cache of the backend/FOURCC/resolution that worked last time per camera,
+# tried first on startup to skip the full backend probe
+CAMERA_PROBE_CACHE = os.environ.get(
+    "CAMERA_PROBE_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "hand-detection", "camera_probe.json")
+)
+
+# Keep the camera's compressed MJPEG frames and decode only the frames that
+# are consumed; viewers that request "raw" get the JPEG forwarded unmodified
+CAMERA_RAW_MJPEG = os.environ.get("CAMERA_RAW_MJPEG", "0") == "1"
+
+# Record every camera's frames to a frame store for later replay with
+# FRAME_SOURCE=replay:<file>; "{camera}" is replaced by the camera id
+CAMERA_RECORD_PATH = os.environ.get("CAMERA_RECORD_PATH", "")
+
+# Headless mode: run detection only and skip all overlay drawing and video
+# encoding (main.py), for nodes that only forward detection_data
+HEADLESS = os.environ.get("HEADLESS", "0") == "1"
+
+# Run MediaPipe in this many worker processes fed through shared memory
+# (0 keeps inference in the server process). Uses fork, so Linux only
+DETECTION_PROCESSES = int(os.environ.get("DETECTION_PROCESSES", 0))
+
+# Detect-then-track: run full MediaPipe inference only every few frames and
+# follow the landmarks with optical flow in between (adaptive interval)
+HAND_TRACKING = os.environ.get("HAND_TRACKING", "0") == "1"
+HAND_TRACKING_MAX_INTERVAL = int(os.environ.get("HAND_TRACKING_MAX_INTERVAL", 6))
+
+# MediaPipe input size as a fraction of the camera frame (1.0 = full size).
+# With LATENCY_BUDGET_MS set, the scale is picked automatically from the
+# rolling p95 inference time instead
+INFERENCE_SCALE = float(os.environ.get("INFERENCE_SCALE", 1.0))
+LATENCY_BUDGET_MS = float(os.environ.get("LATENCY_BUDGET_MS", 0)) or None
+
+# ROI mode: once a hand is found, run inference only on a padded crop around
+# it, with a full-frame search every ROI_FULL_SEARCH_INTERVAL frames
+INFERENCE_ROI = os.environ.get("INFERENCE_ROI", "0") == "1"
+ROI_FULL_SEARCH_INTERVAL = int(os.environ.get("ROI_FULL_SEARCH_INTERVAL", 15))
+
+# Skip inference and reuse the last result while a tiny thumbnail of the
+# scene stays unchanged (e.g. an empty counter)
+MOTION_GATE = os.environ.get("MOTION_GATE", "0") == "1"
+
+# Hand skeleton drawing: "mediapipe" (mp_draw.draw_landmarks per hand) or
+# "fast" (all hands in a few vectorized calls, same style)
+LANDMARK_RENDERER = os.environ.get("LANDMARK_RENDERER", "mediapipe")
+
+# JSON file with the touch widgets to show instead of the default green/red
+# buttons: a list of {"name", "shape": "rect" with "pos"/"size" or "circle"
+# with "center"/"radius", "color", optional "payload" merged into the
+# Node-RED message and "dwell" seconds to hold before it fires}
+WIDGETS_FILE = os.environ.get("WIDGETS_FILE", "")
+
+# MediaPipe model/confidence profile to start with: "lite", "balanced" or
+# "accurate" (see handDetection.PROFILES); switchable at runtime through
+# POST /profile or the "set_profile" Socket.IO event
+DETECTION_PROFILE = os.environ.get("DETECTION_PROFILE", "balanced")
+
+# Per-stage timing histograms served at /metrics (Prometheus text format);
+# with STATS_INTERVAL > 0 the server also pushes a "stats" Socket.IO event
+# to all clients every STATS_INTERVAL seconds
+METRICS = os.environ.get("METRICS", "1") == "1"
+STATS_INTERVAL = float(os.environ.get("STATS_INTERVAL", 0))
+
+# "frame" flips every camera frame before inference, "landmarks" skips the
+# flip and mirrors the detected landmarks instead (the frame is still
+# flipped for display unless HEADLESS)
+MIRROR_MODE = os.environ.get("MIRROR_MODE", "frame")
+
+# Browsers that upload their own webcam frames each get a detector of their
+# own (button, touch and hand state); they share SESSION_DETECTORS MediaPipe
+# graphs. At most SESSION_MAX sessions exist: a new one replaces the least
+# recently used session only once that has been idle SESSION_MIN_IDLE
+# seconds, otherwise its frames are dropped. Sessions idle for
+# SESSION_IDLE_TIMEOUT seconds are closed
+SESSION_DETECTORS = int(os.environ.get("SESSION_DETECTORS", 4))
+SESSION_MAX = int(os.environ.get("SESSION_MAX", 32))
+SESSION_MIN_IDLE = float(os.environ.get("SESSION_MIN_IDLE", 5))
+SESSION_IDLE_TIMEOUT = float(os.environ.get("SESSION_IDLE_TIMEOUT", 60))
@@ -0,0 +1,306 @@
+import atexit
+import cv2
+import itertools
+import multiprocessing
+import numpy as np
+import threading
+from multiprocessing import shared_memory
+
+import handLandmarks
+from handDetection import DEFAULT_PROFILE, PROFILES, WARM_UP_FRAME, HandDetection
+from metrics import metrics
+
+
+# Extra time allowed for the first frame of a stream/profile, while the
+# worker builds its Hands graph
+GRAPH_STARTUP_TIMEOUT = 30.0
+
+def _worker_main(worker_id, shm_name, slot_bytes, tasks, results, profiles):
+    """Worker process: owns the MediaPipe Hands graphs and serves inference tasks"""
+    import mediapipe as mp
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    # One graph per (stream, profile), created the first time a task asks for
+    # it. Hands tracks from frame to frame, so streams never share a graph
+    hands_cache = {}
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            if len(task) == 2:
+                # ("reset", stream): the stream now carries another client's
+                # frames, forget its tracking. ("close", stream): free its graphs
+                command, stream = task
+                for key in [key for key in hands_cache if key[0] == stream]:
+                    if command == "reset":
+                        hands_cache[key].reset()
+                    else:
+                        hands_cache.pop(key).close()
+                continue
+            task_id, slot, shape, stream, profile = task
+            # The parent already wrote the RGB frame into this slot
+            rgb_frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+            rgb_frame.flags.writeable = False
+            try:
+                hands = hands_cache.get((stream, profile))
+                if hands is None:
+                    hands = hands_cache[(stream, profile)] = mp.solutions.hands.Hands(**profiles[profile])
+                output = hands.process(rgb_frame)
+                results.put((
+                    task_id,
+                    handLandmarks.landmarks_to_array(output.multi_hand_landmarks),
+                    handLandmarks.handedness_labels(output.multi_handedness),
+                    None
+                ))
+            except Exception as e:
+                results.put((task_id, None, None, f"worker {worker_id}: {e}"))
+            del rgb_frame
+    finally:
+        for hands in hands_cache.values():
+            hands.close()
+        shm.close()
+
+
+class DetectionEngine:
+    """Runs MediaPipe hand inference in a pool of worker processes.
+
+    Each worker owns its own Hands graph, so inference isn't serialized
+    under one GIL. Frames travel through preallocated shared memory slots
+    (the BGR to RGB conversion writes straight into the slot) and only
+    compact (num_hands, 21, 3) landmark arrays come back.
+
+    Use create_detector() to get HandDetection-compatible detectors that
+    keep their own button state but share the workers. Detectors are spread
+    over the workers round-robin; every detector is a separate stream with
+    its own Hands graphs in its worker, so MediaPipe tracking never mixes
+    frames of different cameras or clients.
+    """
+
+    def __init__(self, num_workers=None, max_frame_shape=(720, 1280, 3), slots_per_worker=2,
+                 profiles=None, timeout=5.0):
+        self.num_workers = num_workers or max(1, multiprocessing.cpu_count() - 1)
+        self.slot_bytes = int(np.prod(max_frame_shape))
+        self.num_slots = self.num_workers * slots_per_worker
+        self.timeout = timeout
+
+        self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * self.num_slots)
+        self.free_slots = list(range(self.num_slots))
+        self.slots_available = threading.Condition()
+
+        # Fork where available: the server module creates cameras at import
+        # time, which spawned workers would otherwise re-run. Forking is only
+        # safe before MediaPipe has run in this process, so create the engine
+        # before any in-process HandDetection
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        self.results = context.Queue()
+        self.task_queues = []
+        self.workers = []
+        for worker_id in range(self.num_workers):
+            tasks = context.Queue()
+            worker = context.Process(
+                target=_worker_main,
+                args=(worker_id, self.shm.name, self.slot_bytes, tasks, self.results,
+                      profiles or PROFILES),
+                daemon=True
+            )
+            worker.start()
+            self.task_queues.append(tasks)
+            self.workers.append(worker)
+
+        self.task_ids = itertools.count(1)
+        self.pending = {}
+        # task_id -> slot of tasks that timed out; the worker may still read
+        # the slot, so it is only freed once their late result comes in
+        self.abandoned = {}
+        self.pending_lock = threading.Lock()
+        self.next_worker = itertools.count()
+        self.stream_ids = itertools.count(1)
+        # (stream, profile) pairs whose graph the worker has already built
+        self.warm_graphs = set()
+        self.running = True
+        self.collector = threading.Thread(target=self._collect_results, daemon=True)
+        self.collector.start()
+        # Don't leave workers or the shared memory block behind on exit
+        atexit.register(self.close)
+        print(f"🧠 Detection engine started with {self.num_workers} worker processes")
+
+    def _collect_results(self):
+        while self.running:
+            try:
+                item = self.results.get(timeout=0.5)
+            except Exception:
+                continue
+            if item is None:
+                break
+            with self.pending_lock:
+                waiter = self.pending.pop(item[0], None)
+                slot = self.abandoned.pop(item[0], None)
+            if slot is not None:
+                self._release_slot(slot)
+            if waiter is not None:
+                waiter[1] = item
+                waiter[0].set()
+
+    def _acquire_slot(self):
+        with self.slots_available:
+            if not self.slots_available.wait_for(lambda: self.free_slots, timeout=self.timeout):
+                raise RuntimeError("Detection engine has no free frame slot")
+            return self.free_slots.pop()
+
+    def _release_slot(self, slot):
+        with self.slots_available:
+            self.free_slots.append(slot)
+            self.slots_available.notify()
+
+    def infer(self, frame, worker=None, profile=DEFAULT_PROFILE, stream=None):
+        """Run inference on a BGR frame in a worker process.
+
+        Blocks until the result is back and returns (landmarks, handedness).
+        `profile` names the PROFILES entry the worker runs the frame with,
+        `stream` keys the worker's graph (see create_detector), frames
+        without one share a graph per profile.
+        Several threads can call this concurrently to use all workers.
+        """
+        if not self.running:
+            raise RuntimeError("Detection engine is closed")
+        h, w = frame.shape[:2]
+        shape = (h, w, 3)
+        if h * w * 3 > self.slot_bytes:
+            raise ValueError(f"Frame {w}x{h} is larger than the engine's frame slots")
+        if worker is None:
+            worker = next(self.next_worker) % self.num_workers
+
+        slot = self._acquire_slot()
+        abandoned = False
+        try:
+            rgb_frame = np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf,
+                                   offset=slot * self.slot_bytes)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+            del rgb_frame
+
+            task_id = next(self.task_ids)
+            waiter = [threading.Event(), None]
+            with self.pending_lock:
+                self.pending[task_id] = waiter
+            self.task_queues[worker].put((task_id, slot, shape, stream, profile))
+
+            graph = (stream, profile)
+            timeout = self.timeout if graph in self.warm_graphs else self.timeout + GRAPH_STARTUP_TIMEOUT
+            if not waiter[0].wait(timeout):
+                with self.pending_lock:
+                    # Unless the result just arrived, the task is still queued
+                    # or running on this slot; the collector frees it later
+                    abandoned = self.pending.pop(task_id, None) is not None
+                    if abandoned:
+                        self.abandoned[task_id] = slot
+                if abandoned:
+                    raise RuntimeError(f"Detection worker {worker} timed out")
+        finally:
+            if not abandoned:
+                self._release_slot(slot)
+
+        _, landmarks, handedness, error = waiter[1]
+        if error is not None:
+            raise RuntimeError(error)
+        self.warm_graphs.add(graph)
+        return landmarks, handedness
+
+    def create_detector(self, **kwargs):
+        """HandDetection with its own state whose inference runs in this engine.
+
+        Keyword arguments are passed on to HandDetection.
+        """
+        worker = next(self.next_worker) % self.num_workers
+        return EngineHandDetection(self, worker, next(self.stream_ids), **kwargs)
+
+    def create_graph(self, profile=DEFAULT_PROFILE):
+        """A worker-side graph as a stand-alone object, e.g. for a GraphPool.
+
+        The worker builds and warms it up before this returns.
+        """
+        worker = next(self.next_worker) % self.num_workers
+        graph = EngineGraph(self, worker, next(self.stream_ids), profile)
+        graph.infer(WARM_UP_FRAME)
+        return graph
+
+    def reset_stream(self, worker, stream):
+        """Clear the tracking state of a stream's graphs"""
+        if self.running:
+            self.task_queues[worker].put(("reset", stream))
+
+    def close_stream(self, worker, stream):
+        """Free the graphs a worker holds for a closed detector"""
+        self.warm_graphs = {graph for graph in self.warm_graphs if graph[0] != stream}
+        if self.running:
+            self.task_queues[worker].put(("close", stream))
+
+    def close(self):
+        if not self.running:
+            return
+        self.running = False
+        for tasks in self.task_queues:
+            tasks.put(None)
+        for worker in self.workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+        self.results.put(None)
+        self.collector.join(timeout=1.0)
+        self.shm.close()
+        self.shm.unlink()
+        print("🧠 Detection engine stopped")
+
+
+class EngineGraph:
+    """One stream's graph in a worker, used like a mediapipe Hands by a GraphPool"""
+
+    def __init__(self, engine, worker, stream, profile):
+        self.engine = engine
+        self.worker = worker
+        self.stream = stream
+        self.profile = profile
+
+    def infer(self, frame):
+        return self.engine.infer(frame, self.worker, self.profile, self.stream)
+
+    def reset(self):
+        self.engine.reset_stream(self.worker, self.stream)
+
+    def close(self):
+        self.engine.close_stream(self.worker, self.stream)
+
+
+class EngineHandDetection(HandDetection):
+    """HandDetection whose MediaPipe inference runs in a DetectionEngine worker"""
+
+    def __init__(self, engine, worker, stream, **kwargs):
+        self.engine = engine
+        self.worker = worker
+        self.stream = stream
+        super().__init__(**kwargs)
+
+    def _create_hands(self, options):
+        # The worker process owns the Hands graphs, it switches with the profile
+        # name sent along with every frame
+        return None
+
+    def _warm_up(self, hands, profile):
+        # Has the worker build this stream's graph for the profile now
+        if self.hands_pool is None:
+            self.engine.infer(WARM_UP_FRAME, self.worker, profile, self.stream)
+
+    def _infer(self, frame):
+        # Includes the copy into shared memory and the round trip to the worker
+        if self.hands_pool is not None:
+            with self.hands_pool.graph(self, self.profile) as graph, metrics.timer("hands_process"):
+                landmarks, handedness = graph.infer(frame)
+        else:
+            with metrics.timer("hands_process"):
+                landmarks, handedness = self.engine.infer(frame, self.worker, self.profile, self.stream)
+        return landmarks, handedness, None
+
+    def close(self):
+        super().close()
+        self.engine.close_stream(self.worker, self.stream)
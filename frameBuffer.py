@@ -0,0 +1,185 @@
+import cv2 as cv
+import threading
+import numpy as np
+
+
+# imdecode flags that let libjpeg skip work by decoding at 1/2 or 1/4 size
+REDUCED_DECODE_FLAGS = {
+    1: cv.IMREAD_COLOR,
+    2: cv.IMREAD_REDUCED_COLOR_2,
+    4: cv.IMREAD_REDUCED_COLOR_4,
+}
+
+
+class FrameLease:
+    """Read-only view of a ring buffer slot, pinned until release() is called.
+
+    A slot holds either a decoded BGR frame or, in raw MJPEG mode, the
+    compressed JPEG bytes (exposed as .jpeg). JPEG frames are only decoded
+    when a consumer asks for .frame or image().
+    """
+
+    def __init__(self, ring, slot, frame, seq, timestamp, jpeg=None):
+        self._ring = ring
+        self._slot = slot
+        self._frame = frame
+        self._decoded = {}
+        self.jpeg = jpeg
+        self.seq = seq
+        self.timestamp = timestamp
+
+    @property
+    def frame(self):
+        """Full-size BGR frame"""
+        return self.image(1)
+
+    def image(self, reduction=1):
+        """BGR frame at 1/1, 1/2 or 1/4 size, decoded or resized on first use"""
+        if reduction not in self._decoded:
+            if self.jpeg is not None:
+                image = cv.imdecode(self.jpeg, REDUCED_DECODE_FLAGS[reduction])
+            elif self._frame is None or reduction == 1:
+                image = self._frame
+            else:
+                image = cv.resize(self._frame, None, fx=1 / reduction, fy=1 / reduction,
+                                  interpolation=cv.INTER_AREA)
+            self._decoded[reduction] = image
+        return self._decoded[reduction]
+
+    def release(self):
+        """Unpin the slot so the capture thread can reuse it"""
+        if self._ring is not None:
+            self._ring._unpin(self._slot)
+            self._ring = None
+            self._frame = None
+            self.jpeg = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def __del__(self):
+        self.release()
+
+
+class FrameRingBuffer:
+    """Preallocated N-slot ring of frame arrays with sequence numbers.
+
+    The writer fills a free slot in place and publishes it with commit().
+    Readers borrow the latest published slot as a read-only view; a borrowed
+    slot is never handed back to the writer until its lease is released.
+    """
+
+    def __init__(self, num_slots=4, shape=(480, 640, 3), dtype=np.uint8):
+        if num_slots < 2:
+            raise ValueError("FrameRingBuffer needs at least 2 slots")
+        self.num_slots = num_slots
+        self.lock = threading.Lock()
+        # Signalled on every commit so consumers can block for the next frame
+        self.new_frame = threading.Condition(self.lock)
+        self._allocate(shape, dtype)
+
+    def _allocate(self, shape, dtype):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.slots = [np.empty(self.shape, dtype=self.dtype) for _ in range(self.num_slots)]
+        self.seqs = [0] * self.num_slots
+        self.timestamps = [0.0] * self.num_slots
+        # Byte count per slot when slots hold compressed JPEG data
+        self.lengths = [None] * self.num_slots
+        self.pins = [0] * self.num_slots
+        # Slots reserved by writers that haven't committed or aborted yet
+        self.writing = set()
+        self.latest = None
+        self.seq = 0
+        self.dropped = 0
+
+    def acquire_write_slot(self):
+        """Reserve a slot for the writer, or None if every other slot is pinned"""
+        with self.lock:
+            start = -1 if self.latest is None else self.latest
+            for offset in range(1, self.num_slots + 1):
+                index = (start + offset) % self.num_slots
+                # Slots still reserved by uncommitted writes are not free either
+                if index != self.latest and index not in self.writing and self.pins[index] == 0:
+                    self.writing.add(index)
+                    return index, self.slots[index]
+            self.dropped += 1
+            return None, None
+
+    def commit(self, index, timestamp, frame=None, nbytes=None):
+        """Publish a written slot as the latest frame and return its sequence number,
+        or None if the slot isn't reserved for writing.
+
+        If the capture backend could not write in place (e.g. the device
+        switched resolution) it returns a fresh array; that array is adopted
+        as the slot's storage so the ring converges to the new shape.
+        nbytes marks the slot as holding that many bytes of JPEG data.
+        """
+        with self.lock:
+            if index not in self.writing:
+                # Not reserved (anymore), e.g. a writer outliving a reset
+                return None
+            if frame is not None and frame is not self.slots[index]:
+                self.slots[index] = frame
+                self.shape = frame.shape
+                self.dtype = frame.dtype
+            self.seq += 1
+            self.seqs[index] = self.seq
+            self.timestamps[index] = timestamp
+            self.lengths[index] = nbytes
+            self.latest = index
+            self.writing.discard(index)
+            self.new_frame.notify_all()
+            return self.seq
+
+    def abort(self, index):
+        """Give back a reserved slot without publishing it"""
+        with self.lock:
+            self.writing.discard(index)
+
+    def borrow(self):
+        """Borrow the latest frame as a read-only FrameLease, or None if empty"""
+        with self.lock:
+            return self._borrow_locked()
+
+    def wait_for(self, after_seq=0, timeout=None):
+        """Block until a frame newer than after_seq is published and borrow it.
+
+        Returns a FrameLease, or None if nothing new arrived within timeout.
+        """
+        with self.lock:
+            if not self.new_frame.wait_for(lambda: self.latest is not None and self.seq > after_seq,
+                                           timeout=timeout):
+                return None
+            return self._borrow_locked()
+
+    def _borrow_locked(self):
+        if self.latest is None:
+            return None
+        index = self.latest
+        self.pins[index] += 1
+        nbytes = self.lengths[index]
+        view = self.slots[index].view() if nbytes is None else self.slots[index][:nbytes]
+        view.flags.writeable = False
+        if nbytes is not None:
+            return FrameLease(self, index, None, self.seqs[index], self.timestamps[index], jpeg=view)
+        return FrameLease(self, index, view, self.seqs[index], self.timestamps[index])
+
+    def _unpin(self, index):
+        with self.lock:
+            if self.pins[index] > 0:
+                self.pins[index] -= 1
+
+    def reset(self):
+        """Forget published frames (e.g. when the device is reopened).
+
+        Slots still reserved by a writer stay reserved until it commits or
+        aborts, so a capture thread that outlived a reopen never shares a
+        slot with the new one.
+        """
+        with self.lock:
+            self.latest = None
+            self.new_frame.notify_all()
@@ -0,0 +1,211 @@
+import cv2 as cv
+import numpy as np
+import os
+import time
+
+from frameBuffer import FrameLease
+
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+class FrameSource:
+    """Base class for non-camera frame sources.
+
+    Implements the same get_frame/is_opened/release contract as
+    camera.Camera so sources can be swapped without touching the pipeline.
+    With realtime=True frames are paced at the source fps, otherwise they
+    are returned as fast as the consumer asks for them.
+    """
+
+    def __init__(self, fps=30.0, realtime=True, loop=True):
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.realtime = realtime
+        self.loop = loop
+        self.frame_count = 0
+        self.opened = True
+        self._next_due = None
+
+    def _read(self):
+        """Return the next frame or None when the source is exhausted"""
+        raise NotImplementedError
+
+    def _rewind(self):
+        """Restart the source from the first frame, return False if unsupported"""
+        return False
+
+    def _pace(self):
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self._next_due is None:
+            self._next_due = now
+        elif self._next_due > now:
+            time.sleep(self._next_due - now)
+        else:
+            # Running late - don't try to catch up with a burst of frames
+            self._next_due = now
+        self._next_due += 1.0 / self.fps
+
+    def get_frame(self):
+        """Get the next frame, or None once the source is exhausted"""
+        if not self.opened:
+            return None
+
+        self._pace()
+        frame = self._read()
+        if frame is None and self.loop and self._rewind():
+            frame = self._read()
+        if frame is None:
+            self.opened = False
+            return None
+
+        self.frame_count += 1
+        return frame
+
+    def borrow_frame(self):
+        """Same as get_frame but wrapped in a FrameLease like camera.Camera"""
+        frame = self.get_frame()
+        if frame is None:
+            return None
+        return FrameLease(None, None, frame, self.frame_count, time.time())
+
+    def wait_for_frame(self, after_seq=0, timeout=1.0):
+        """Same as borrow_frame, every call already yields a new paced frame"""
+        return self.borrow_frame()
+
+    def is_opened(self):
+        return self.opened
+
+    def openCamera(self):
+        """Sources can't be reopened once exhausted, report their state"""
+        return self.is_opened()
+
+    def release(self):
+        self.opened = False
+
+    def stop(self):
+        """Alias for release"""
+        self.release()
+
+
+class VideoFileSource(FrameSource):
+    """Frames decoded from a video file"""
+
+    def __init__(self, path, realtime=True, loop=True):
+        self.path = path
+        self.cap = cv.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Could not open video file {path}")
+        super().__init__(fps=self.cap.get(cv.CAP_PROP_FPS), realtime=realtime, loop=loop)
+        print(f"🎞️  Video source {path} @ {self.fps:.1f} fps")
+
+    def _read(self):
+        if self.cap is None:
+            return None
+        ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def _rewind(self):
+        return self.cap is not None and self.cap.set(cv.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self):
+        super().release()
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class ImageDirectorySource(FrameSource):
+    """Frames read from the images of a directory in file name order"""
+
+    def __init__(self, directory, fps=30.0, realtime=True, loop=True):
+        self.directory = directory
+        self.files = sorted(
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.files:
+            raise IOError(f"No images found in {directory}")
+        self.index = 0
+        super().__init__(fps=fps, realtime=realtime, loop=loop)
+        print(f"🖼️  Image source {directory}: {len(self.files)} images")
+
+    def _read(self):
+        while self.index < len(self.files):
+            path = self.files[self.index]
+            self.index += 1
+            frame = cv.imread(path, cv.IMREAD_COLOR)
+            if frame is not None:
+                return frame
+            print(f"⚠️  Skipping unreadable image {path}")
+        return None
+
+    def _rewind(self):
+        self.index = 0
+        return True
+
+
+class SyntheticSource(FrameSource):
+    """Deterministic generated frames, identical for the same seed"""
+
+    def __init__(self, width=640, height=480, fps=30.0, num_frames=None, seed=0,
+                 realtime=True, loop=True):
+        self.width = width
+        self.height = height
+        self.num_frames = num_frames
+        self.index = 0
+
+        # Fixed noisy gradient background, only the moving blob changes per frame
+        rng = np.random.default_rng(seed)
+        gradient = np.linspace(40, 160, width, dtype=np.float32)
+        background = np.broadcast_to(gradient, (height, width))[..., None].repeat(3, axis=2)
+        noise = rng.integers(-10, 10, size=(height, width, 3))
+        self.background = np.clip(background + noise, 0, 255).astype(np.uint8)
+        self.phase = rng.uniform(0, 2 * np.pi)
+        super().__init__(fps=fps, realtime=realtime, loop=loop)
+
+    def _read(self):
+        if self.num_frames is not None and self.index >= self.num_frames:
+            return None
+        t = self.index / self.fps
+        self.index += 1
+
+        frame = self.background.copy()
+        cx = int(self.width / 2 + self.width / 3 * np.sin(t + self.phase))
+        cy = int(self.height / 2 + self.height / 4 * np.cos(1.3 * t + self.phase))
+        cv.circle(frame, (cx, cy), 40, (80, 140, 220), cv.FILLED)
+        cv.putText(frame, f"#{self.index}", (10, self.height - 10),
+                   cv.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        return frame
+
+    def _rewind(self):
+        self.index = 0
+        return True
+
+
+def create_frame_source(spec="camera", pacing="realtime", raw_mjpeg=False):
+    """Create a frame source from a configuration string.
+
+    spec is one of "camera", "camera:<index>", "video:<path>",
+    "images:<directory>", "replay:<frame store>" or "synthetic". pacing is "realtime" to play
+    sources at their native fps or "fast" to run as fast as possible.
+    raw_mjpeg only applies to cameras.
+    """
+    kind, _, arg = spec.partition(":")
+    realtime = pacing != "fast"
+
+    if kind == "camera":
+        from camera import Camera
+        return Camera(camera_index=int(arg) if arg else 0, raw_mjpeg=raw_mjpeg)
+    if kind == "video":
+        return VideoFileSource(arg, realtime=realtime)
+    if kind == "images":
+        return ImageDirectorySource(arg, realtime=realtime)
+    if kind == "replay":
+        from frameStore import ReplaySource
+        return ReplaySource(arg, realtime=realtime)
+    if kind == "synthetic":
+        return SyntheticSource(realtime=realtime)
+    raise ValueError(f"Unknown frame source: {spec}")
@@ -0,0 +1,184 @@
+import numpy as np
+import os
+import struct
+import threading
+import time
+
+from frameSource import FrameSource
+
+
+# File layout: a fixed 64 byte header followed by fixed-size records of
+# (float64 capture timestamp, height x width x channels uint8 frame).
+# The timestamp column doubles as the index, so the whole file can be
+# opened with a single numpy.memmap and no separate index file.
+MAGIC = b"HDFRAME1"
+VERSION = 1
+HEADER_FORMAT = "<8sIIII"
+HEADER_SIZE = 64
+
+
+def record_dtype(width, height, channels=3):
+    return np.dtype([("timestamp", "<f8"), ("frame", np.uint8, (height, width, channels))])
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise IOError(f"{path} is not a frame store (header too short)")
+    magic, version, width, height, channels = struct.unpack_from(HEADER_FORMAT, header)
+    if magic != MAGIC:
+        raise IOError(f"{path} is not a frame store (bad magic)")
+    if version != VERSION:
+        raise IOError(f"Unsupported frame store version {version} in {path}")
+    return width, height, channels
+
+
+class FrameRecorder:
+    """Append-only writer for the frame store format"""
+
+    def __init__(self, path, width=640, height=480, channels=3):
+        self.path = path
+        self.shape = (height, width, channels)
+        self.frame_count = 0
+        self.skipped = 0
+        self.lock = threading.Lock()
+        self.file = open(path, "wb")
+        header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, width, height, channels)
+        self.file.write(header.ljust(HEADER_SIZE, b"\0"))
+        print(f"⏺️  Recording {width}x{height} frames to {path}")
+
+    def append(self, frame, timestamp):
+        """Append one frame, frames with a different shape are skipped"""
+        if frame.shape != self.shape or frame.dtype != np.uint8:
+            self.skipped += 1
+            return False
+        with self.lock:
+            if self.file is None:
+                return False
+            self.file.write(struct.pack("<d", timestamp))
+            # Write straight from the frame's buffer, no intermediate bytes copy
+            self.file.write(memoryview(np.ascontiguousarray(frame)).cast("B"))
+            self.frame_count += 1
+        return True
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+                print(f"⏹️  Recorded {self.frame_count} frames to {self.path}")
+                if self.skipped:
+                    h, w = self.shape[:2]
+                    print(f"⚠️  Skipped {self.skipped} frames that were not {w}x{h}")
+
+
+class CameraRecorder:
+    """Records every frame a camera.Camera captures from a background thread.
+
+    Frames are borrowed from the camera's ring buffer, so recording adds no
+    copies to the capture path; if the disk can't keep up, frames are
+    skipped and counted in .missed rather than stalling the camera.
+    """
+
+    def __init__(self, camera, path):
+        self.camera = camera
+        self.path = path
+        # Created from the first captured frame, the camera may not deliver
+        # the size its ring was preallocated with
+        self.recorder = None
+        self.missed = 0
+        self.recording = True
+        self.thread = threading.Thread(target=self._record, daemon=True)
+        self.thread.start()
+
+    def _record(self):
+        last_seq = 0
+        while self.recording:
+            lease = self.camera.wait_for_frame(last_seq, timeout=0.5)
+            if lease is None:
+                continue
+            with lease:
+                if last_seq:
+                    self.missed += lease.seq - last_seq - 1
+                last_seq = lease.seq
+                frame = lease.frame
+                if self.recorder is None:
+                    height, width = frame.shape[:2]
+                    self.recorder = FrameRecorder(self.path, width, height)
+                self.recorder.append(frame, lease.timestamp)
+
+    def stop(self):
+        self.recording = False
+        if self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+        if self.recorder is None:
+            print(f"⚠️  No frames captured, nothing recorded to {self.path}")
+        else:
+            self.recorder.close()
+
+
+class ReplaySource(FrameSource):
+    """Frame source replaying a frame store zero-copy through numpy.memmap.
+
+    With realtime=True frames are delivered at their recorded capture
+    timing, otherwise as fast as they are requested. Returned frames are
+    read-only views into the mapped file.
+    """
+
+    def __init__(self, path, realtime=True, loop=True):
+        self.path = path
+        width, height, channels = read_header(path)
+        dtype = record_dtype(width, height, channels)
+        # Trailing partial record (e.g. recorder killed mid-write) is ignored
+        count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+        if count <= 0:
+            raise IOError(f"No frames recorded in {path}")
+        self.records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+        self.frames = self.records["frame"]
+        self.timestamps = self.records["timestamp"]
+        self.index = 0
+        self._replay_start = None
+
+        duration = float(self.timestamps[-1] - self.timestamps[0])
+        fps = (count - 1) / duration if count > 1 and duration > 0 else 30.0
+        super().__init__(fps=fps, realtime=realtime, loop=loop)
+        print(f"▶️  Replay source {path}: {count} frames, {width}x{height} @ {fps:.1f} fps")
+
+    def _pace(self):
+        # Frame 0 is never delayed, it anchors the timing when it is read
+        if not self.realtime or self._replay_start is None:
+            return
+        if self.index < len(self.timestamps):
+            offset = float(self.timestamps[self.index] - self.timestamps[0])
+        elif self.loop:
+            # Looping back to frame 0 one average frame interval after the last
+            offset = float(self.timestamps[-1] - self.timestamps[0]) + 1.0 / self.fps
+        else:
+            return
+        # Sleep until this frame's offset from the first recorded frame
+        due = self._replay_start + offset
+        now = time.perf_counter()
+        if due > now:
+            time.sleep(due - now)
+
+    def _read(self):
+        if self.index >= len(self.frames):
+            return None
+        if self.index == 0:
+            # Re-anchored on every pass, including after a loop rewind
+            self._replay_start = time.perf_counter()
+        frame = self.frames[self.index]
+        self.index += 1
+        return frame
+
+    def _rewind(self):
+        self.index = 0
+        self._replay_start = None
+        return True
+
+    def release(self):
+        super().release()
+        self.frames = None
+        self.timestamps = None
+        self.records = None
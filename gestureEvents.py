@@ -0,0 +1,119 @@
+import itertools
+import threading
+import time
+
+
+class GestureEventStream:
+    """Ordered stream of hand/button events with sequence numbers.
+
+    Producers call emit(); every subscriber (Node-RED, a socket, a log) is
+    called with each event dict in order. Events carry a stream-wide "seq"
+    so sinks can spot gaps, and the wall clock "time" they happened.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seq = itertools.count(1)
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        with self.lock:
+            self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def emit(self, event_type, now=None, fields=None, **kwargs):
+        """Number, timestamp and deliver one event.
+
+        Its fields come from kwargs and the `fields` dict, which may hold
+        any keys (e.g. a widget payload); neither can replace seq, time or type.
+        """
+        # Numbering and delivery under one lock keeps every sink in seq order
+        with self.lock:
+            event = {"seq": next(self.seq), "time": now or time.time(), "type": event_type}
+            for key, value in {**(fields or {}), **kwargs}.items():
+                event.setdefault(key, value)
+            for callback in self.subscribers:
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"Error in gesture event subscriber: {e}")
+        return event
+
+
+class SourceEventStream:
+    """A detector's view of a shared GestureEventStream.
+
+    Every event it emits is tagged with where it came from: "source" is
+    e.g. "camera" or "client", "source_id" the camera id or session id.
+    """
+
+    def __init__(self, stream, source, source_id):
+        self.stream = stream
+        self.source = source
+        self.source_id = source_id
+
+    def emit(self, event_type, now=None, fields=None, **kwargs):
+        return self.stream.emit(event_type, now, fields, source=self.source, source_id=self.source_id, **kwargs)
+
+
+class HandStateMachine:
+    """Per-hand state that turns per-frame detections into edge events.
+
+    Hands are keyed by handedness. A hand enters the first frame it is seen
+    and leaves after leave_frames frames without it; a new finger count is
+    only reported once it held for stable_frames frames, so a flickering
+    count doesn't flood the stream.
+    """
+
+    def __init__(self, stream, stable_frames=3, leave_frames=5):
+        self.stream = stream
+        self.stable_frames = stable_frames
+        self.leave_frames = leave_frames
+        self.hands = {}
+
+    @staticmethod
+    def hand_keys(result):
+        """Stable-ish key per hand: its handedness, numbered if two share one"""
+        labels = [result.handedness[i] if i < len(result.handedness) else "Hand" for i in range(result.num_hands)]
+        return [label if labels.count(label) == 1 else f"{label}-{i}" for i, label in enumerate(labels)]
+
+    def update(self, result, now):
+        """Feed one frame's HandResult; returns the events it emitted"""
+        events = []
+        seen = set()
+        for hand_idx, key in enumerate(self.hand_keys(result)):
+            fingers = int(result.finger_counts[hand_idx])
+            seen.add(key)
+            state = self.hands.get(key)
+            if state is None:
+                self.hands[key] = {"fingers": fingers, "candidate": None, "streak": 0, "missed": 0}
+                events.append(self.stream.emit("hand_enter", now, hand=key, fingers=fingers))
+                continue
+
+            state["missed"] = 0
+            if fingers == state["fingers"]:
+                state["candidate"], state["streak"] = None, 0
+                continue
+            if fingers == state["candidate"]:
+                state["streak"] += 1
+            else:
+                state["candidate"], state["streak"] = fingers, 1
+            if state["streak"] >= self.stable_frames:
+                events.append(self.stream.emit(
+                    "fingers_changed", now, hand=key, fingers=fingers, previous=state["fingers"]
+                ))
+                state["fingers"], state["candidate"], state["streak"] = fingers, None, 0
+
+        for key in list(self.hands):
+            if key in seen:
+                continue
+            self.hands[key]["missed"] += 1
+            if self.hands[key]["missed"] >= self.leave_frames:
+                del self.hands[key]
+                events.append(self.stream.emit("hand_leave", now, hand=key))
+        return events
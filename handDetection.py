@@ -1,28 +1,168 @@
 import cv2
 import mediapipe as mp
 import numpy as np
+import threading
 import time  # Add time module for tracking
+from collections import OrderedDict
+
+import handLandmarks
+from gestureEvents import GestureEventStream, HandStateMachine, SourceEventStream
+from handTracker import LandmarkTracker
+from inferenceScaler import InferenceScaler
+from landmarkRenderer import LandmarkRenderer
+from metrics import metrics
+from motionGate import MotionGate
+from overlayCompositor import OverlayCompositor
+from widgetRegistry import TouchTracker, WidgetRegistry, load_widgets
+
+
+# Named MediaPipe Hands settings, shared by in-process and worker process
+# detectors and switchable at runtime with HandDetection.set_profile()
+PROFILES = {
+    # Smaller palm/landmark models and a single hand, for slow machines or load spikes
+    "lite": {
+        "static_image_mode": False,
+        "max_num_hands": 1,
+        "model_complexity": 0,
+        "min_detection_confidence": 0.5,
+        "min_tracking_confidence": 0.5
+    },
+    "balanced": {
+        "static_image_mode": False,
+        "max_num_hands": 2,
+        "model_complexity": 1,
+        "min_detection_confidence": 0.5,
+        "min_tracking_confidence": 0.5
+    },
+    # Stricter confidences: re-detects instead of following a doubtful track
+    "accurate": {
+        "static_image_mode": False,
+        "max_num_hands": 2,
+        "model_complexity": 1,
+        "min_detection_confidence": 0.7,
+        "min_tracking_confidence": 0.7
+    },
+}
+DEFAULT_PROFILE = "balanced"
+
+# Blank frame run through a new graph once, its first process() call is
+# much slower than the following ones
+WARM_UP_FRAME = np.zeros((256, 256, 3), dtype=np.uint8)
+
+
+def create_hands_graph(profile):
+    """Warmed-up MediaPipe Hands graph for a named profile, e.g. as a GraphPool factory"""
+    hands = mp.solutions.hands.Hands(**PROFILES[profile])
+    hands.process(WARM_UP_FRAME)
+    return hands
+
+
+class HandResult:
+    """Output of HandDetection.detect(), everything render() needs to draw a frame"""
+
+    def __init__(self, width, height, landmarks=None, handedness=None, hand_landmarks=None):
+        self.width = width
+        self.height = height
+        # (num_hands, 21, 3) float32 normalized landmarks, the hand data the
+        # rest of the pipeline consumes
+        self.landmarks = landmarks if landmarks is not None else handLandmarks.empty_landmarks()
+        self.handedness = handedness or []
+        # Original MediaPipe landmark protobufs, only needed by mp_draw
+        self.hand_landmarks = hand_landmarks or []
+        self.finger_counts = handLandmarks.count_fingers(self.landmarks)
+        self.touched_buttons = []
+        self._pixels = None
+        self.detection_data = {
+            "num_hands": 0,
+            "hands": [],
+            "fingers_count": 0,
+            "buttons_active": False,
+            "touched_button": None
+        }
+
+    @property
+    def num_hands(self):
+        return len(self.landmarks)
+
+    @property
+    def pixels(self):
+        """(num_hands, 21, 2) int32 pixel coordinates of the landmarks"""
+        if self._pixels is None:
+            self._pixels = handLandmarks.to_pixels(self.landmarks, self.width, self.height)
+        return self._pixels
 
 
 class HandDetection:
-    def __init__(self, nodeRedClient=None):
-        # Initialize MediaPipe Hands solution
+    def __init__(self, nodeRedClient=None, headless=False, tracking=False, max_tracking_interval=6,
+                 inference_scale=1.0, latency_budget_ms=None, roi=False, roi_full_search_interval=15,
+                 motion_gate=False, landmark_renderer="mediapipe", widgets=None, event_stream=None,
+                 profile=DEFAULT_PROFILE, mirror="frame", hands_pool=None, event_source=None):
+        # Initialize MediaPipe Hands solution. One Hands graph per profile,
+        # created the first time the profile is used and kept for switching back.
+        # With a hands_pool (see sessionPool.GraphPool) the detector owns no
+        # graph and borrows one from the pool for every inference instead
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown detection profile '{profile}'")
+        self.hands_pool = hands_pool
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        self.profile = profile
+        self.requested_profile = profile
+        self.hands_cache = {profile: self._create_hands(PROFILES[profile])}
+        self.profile_lock = threading.Lock()
+        self.hands = self.hands_cache[profile]
         self.mp_draw = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
 
         # Store Node-Red Client
         self.nodeRedClient = nodeRedClient
 
-        # Button definitions
-        self.button_left = {"pos": (490, 50), "size": (100, 50), "color": (0, 255, 0), "name": "green"}
-        self.button_right = {"pos": (50, 50), "size": (100, 50), "color": (0, 0, 255), "name": "red"}
+        # Hand and button changes go out as edge-triggered events. Detectors
+        # can share one stream (and its sequence numbers); sinks such as
+        # Node-RED subscribe to it instead of being sent every frame.
+        # event_source, e.g. ("camera", 0) or ("client", sid), tags each event
+        # with the detector it came from
+        if event_stream is None:
+            event_stream = GestureEventStream()
+            if nodeRedClient is not None:
+                event_stream.subscribe(nodeRedClient.sendEvent)
+        if event_source is not None:
+            event_stream = SourceEventStream(event_stream, *event_source)
+        self.events = event_stream
+        self.hand_states = HandStateMachine(self.events)
+
+        # Headless mode only produces detection_data, no overlays are drawn
+        self.headless = headless
+
+        # Detect-then-track: full inference every few frames, optical flow in between
+        self.tracker = LandmarkTracker(max_interval=max_tracking_interval) if tracking else None
+
+        # MediaPipe input size relative to the frame, optionally chosen from a
+        # latency budget. Landmarks are normalized, so they map back to
+        # full-frame pixels unchanged
+        self.inference_scale = inference_scale
+        self.scaler = InferenceScaler(latency_budget_ms) if latency_budget_ms else None
+        # How much smaller than the camera frame the frame being detected is, see process_lease
+        self.input_reduction = 1
+
+        # ROI mode: run inference only on a padded crop around the last hands,
+        # with a full-frame search every roi_full_search_interval frames
+        self.roi = roi
+        self.roi_full_search_interval = roi_full_search_interval
+        self.last_landmarks = None
+        self.frames_since_full_search = 0
+
+        # Motion gate: reuse the last result while the scene doesn't change
+        self.motion_gate = MotionGate() if motion_gate else None
+        self.last_output = None
+
+        # "fast" draws all hand skeletons at once with LandmarkRenderer,
+        # "mediapipe" uses mp_draw.draw_landmarks per hand
+        self.landmark_renderer = LandmarkRenderer() if landmark_renderer == "fast" else None
+
+        # Touch targets (see widgetRegistry.load_widgets), pressed once per
+        # touch through the enter/dwell/exit tracker
+        self.widgets = WidgetRegistry(widgets if widgets is not None else load_widgets())
+        self.touch_tracker = TouchTracker(self.widgets)
         
         # Add flag to track if buttons should be shown
         self.show_buttons = False
@@ -30,99 +170,346 @@ class HandDetection:
         # Add timestamp for last hand detection
         self.last_hand_detected_time = 0
 
-    def _is_touching(self, finger_pos, button):
-        bx, by = button["pos"]
-        bw, bh = button["size"]
-        fx, fy = finger_pos
-        return bx <= fx <= bx + bw and by <= fy <= by + bh
-    
-    def _count_fingers(self, hand_landmarks):
-        # Get fingertip landmarks
-        fingertips = [
-            self.mp_hands.HandLandmark.THUMB_TIP,
-            self.mp_hands.HandLandmark.INDEX_FINGER_TIP,
-            self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP,
-            self.mp_hands.HandLandmark.RING_FINGER_TIP,
-            self.mp_hands.HandLandmark.PINKY_TIP
-        ]
-        
-        # Get middle knuckle landmarks
-        knuckles = [
-            self.mp_hands.HandLandmark.THUMB_IP,  # For thumb
-            self.mp_hands.HandLandmark.INDEX_FINGER_PIP,
-            self.mp_hands.HandLandmark.MIDDLE_FINGER_PIP,
-            self.mp_hands.HandLandmark.RING_FINGER_PIP,
-            self.mp_hands.HandLandmark.PINKY_PIP
-        ]
-        
-        # Count extended fingers
-        extended_fingers = 0
-        for i in range(5):
-            # Thumb is handled differently due to its orientation
-            if i == 0:
-                # Check if thumb is extended based on its position relative to index finger
-                if hand_landmarks.landmark[fingertips[i]].x < hand_landmarks.landmark[knuckles[1]].x:
-                    extended_fingers += 1
-            else:
-                # For other fingers, check if fingertip is higher than knuckle
-                if hand_landmarks.landmark[fingertips[i]].y < hand_landmarks.landmark[knuckles[i]].y:
-                    extended_fingers += 1
-                    
-        return extended_fingers
+        # Static button and instruction overlays, pre-rendered per frame size
+        self.overlay = OverlayCompositor(self._draw_overlay)
+
+        # "frame" flips every frame before inference (the selfie view MediaPipe
+        # expects), "landmarks" runs inference on the camera frame and mirrors
+        # the landmark x coordinates and handedness instead
+        if mirror not in ("frame", "landmarks"):
+            raise ValueError(f"Unknown mirror mode '{mirror}'")
+        self.mirror = mirror
+
+        # Reusable flip/RGB buffers per resolution. Callers run one frame at
+        # a time through a detector (SessionPool, CameraPool.detector) and
+        # encode the returned frame before handing the detector on
+        self.scratch = OrderedDict()
+
+    def _create_hands(self, options):
+        if self.hands_pool is not None:
+            return None
+        return self.mp_hands.Hands(**options)
+
+    def set_profile(self, profile):
+        """Switch to a named profile, applied before the next frame is detected.
+
+        A profile used for the first time gets its graph built and warmed up
+        here, on the caller's thread, so the stream only swaps a reference.
+        With a hands_pool nothing is built here, prepare the pool instead
+        (see GraphPool.prepare).
+        """
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown detection profile '{profile}'")
+        with self.profile_lock:
+            if profile not in self.hands_cache:
+                hands = self._create_hands(PROFILES[profile])
+                self._warm_up(hands, profile)
+                self.hands_cache[profile] = hands
+        self.requested_profile = profile
+
+    def _warm_up(self, hands, profile):
+        if hands is not None:
+            hands.process(WARM_UP_FRAME)
+
+    def _apply_profile(self):
+        profile = self.requested_profile
+        self.hands = self.hands_cache[profile]
+        print(f"🎛️  Detection profile {self.profile} -> {profile}")
+        self.profile = profile
+
+    def _buffer(self, name, shape, max_buffers=8):
+        """Scratch array of this shape, reused by every process_frame call.
+
+        The returned frame of one process_frame call stays valid until the
+        next call on this detector.
+        """
+        buffers = self.scratch
+        key = (name, shape)
+        buffer = buffers.get(key)
+        if buffer is None:
+            # ROI crops come in many sizes, drop the least recently used
+            # buffers; the full-frame ones are used every frame and stay
+            if len(buffers) >= max_buffers:
+                buffers.popitem(last=False)
+            buffer = buffers[key] = np.empty(shape, dtype=np.uint8)
+        else:
+            buffers.move_to_end(key)
+        return buffer
+
+    def _flip(self, frame):
+        with metrics.timer("flip"):
+            return cv2.flip(frame, 1, dst=self._buffer("flip", frame.shape))
+
+    def decode_reduction(self):
+        """1, 2 or 4: the camera frame size divisor this detector can work at.
+
+        Headless detectors with a fixed inference scale of 1/2 or 1/4 or less
+        never need the full-size frame.
+        """
+        if not self.headless or self.scaler is not None:
+            return 1
+        for reduction in (4, 2):
+            if self.inference_scale <= 1 / reduction:
+                return reduction
+        return 1
+
+    def process_lease(self, lease):
+        """process_frame on a borrowed frameBuffer.FrameLease.
 
-    def process_frame(self, frame):
-        # Flip the frame
-        frame = cv2.flip(frame, 1)
+        MJPEG frames are decoded at the reduced size from decode_reduction(),
+        which libjpeg does much faster than a full decode plus resize.
+        Coordinates in detection_data stay in full camera frame pixels.
+        """
+        reduction = self.decode_reduction()
+        return self.process_frame(lease.image(reduction), reduction)
+
+    def process_frame(self, frame, reduction=1):
+        """Detect hands on a camera frame and draw the overlays.
+
+        `reduction` tells that the frame was shrunk from the camera frame by
+        that factor (see process_lease); inference then runs at the same
+        inference_scale of the camera frame.
+        Returns (frame, detection_data). The frame may be a buffer reused
+        by the next call on this detector, encode or copy it before then.
+        """
+        if self.mirror == "landmarks":
+            result = self.detect(frame, mirror_landmarks=True, reduction=reduction)
+            if self.headless:
+                # Nothing is drawn, so the frame is never flipped at all
+                return frame, result.detection_data
+            frame = self._flip(frame)
+        else:
+            # Flip the frame
+            frame = self._flip(frame)
+            result = self.detect(frame, reduction=reduction)
+
+        # Headless deployments only need detection_data, skip all drawing
+        if not self.headless:
+            with metrics.timer("render"):
+                self.render(frame, result)
+
+        return frame, result.detection_data
+
+    def detect(self, frame, mirror_landmarks=False, reduction=1):
+        """Run hand detection on an already mirrored BGR frame.
+
+        With mirror_landmarks=True the frame is the unflipped camera image
+        and the landmarks are mirrored to the flipped view afterwards.
+        `reduction` is as in process_frame.
+        Updates the button state and sends touches to Node-RED, but never
+        draws on the frame. Returns a HandResult for render().
+        """
+        self.input_reduction = reduction
+        h, w, _ = frame.shape
+        # Landmarks are normalized, pixel coordinates are for the camera frame
+        h, w = h * reduction, w * reduction
+
+        # Profile switches land between frames, never during inference
+        if self.requested_profile != self.profile:
+            self._apply_profile()
+
+        if self.motion_gate is not None and self.last_output is not None and self.motion_gate.is_static(frame):
+            # Static scene: reuse the cached landmarks, the button timeout below still applies
+            landmarks, handedness, hand_landmarks = self.last_output
+            source = "gated"
+        elif self.tracker is not None:
+            landmarks, handedness, hand_landmarks, source = self._infer_or_track(frame)
+        else:
+            landmarks, handedness, hand_landmarks = self._run_inference(frame)
+            source = "detected"
+        # Gate, tracker and ROI state stay in the coordinates inference ran in
+        self.last_output = (landmarks, handedness, hand_landmarks)
+        self.last_landmarks = landmarks
+        if mirror_landmarks:
+            # MediaPipe labels handedness for a mirrored image, so on the raw
+            # camera frame both the x axis and the labels are swapped
+            landmarks = handLandmarks.mirror_landmarks(landmarks)
+            handedness = handLandmarks.mirror_handedness(handedness)
+            hand_landmarks = None
+        result = HandResult(w, h, landmarks, handedness, hand_landmarks)
+        result.detection_data["source"] = source
+        result.detection_data["profile"] = self.profile
+        pixels = result.pixels
+        finger_counts = result.finger_counts
 
         # Data to send to Node-Red
-        detection_data = {
-            "num_hands": 0,
-            "hands": [],
-            "fingers_count": 0,
-            "buttons_active": self.show_buttons,
-            "touched_button": None
-        }
+        detection_data = result.detection_data
+        for hand_idx in range(result.num_hands):
+            detection_data["hands"].append({
+                "id": hand_idx,
+                "fingers": int(finger_counts[hand_idx]),
+                "handedness": result.handedness[hand_idx] if hand_idx < len(result.handedness) else None,
+                "wrist": pixels[hand_idx, handLandmarks.WRIST].tolist(),
+                "index_tip": pixels[hand_idx, handLandmarks.INDEX_FINGER_TIP].tolist()
+            })
 
-        # Process the frame with MediaPipe first
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        rgb_frame.flags.writeable = False
-        results = self.hands.process(rgb_frame)
+        # Hand enter/leave and finger count changes
+        now = time.time()
+        events = self.hand_states.update(result, now)
+
+        if result.num_hands:
+            detection_data["num_hands"] = result.num_hands
+
+            # Update button visibility based on detection
+            if not self.show_buttons and (finger_counts == 5).any():
+                # Only activate buttons if 5 fingers are detected and buttons are not already active
+                self.show_buttons = True
+                print("5 fingers detected - showing buttons")
+                events.append(self.events.emit("buttons_activated", now))
+
+            if (finger_counts > 0).any():
+                # Update the timestamp as long as any fingers are detected
+                self.last_hand_detected_time = now
+
+        # If no fingers detected for 5 seconds, hide buttons
+        if self.show_buttons and now - self.last_hand_detected_time > 5:
+            self.show_buttons = False
+            print("No fingers detected for 5 seconds - hiding buttons")
+            events.append(self.events.emit("buttons_deactivated", now))
+
+        # Store total finger count
+        detection_data["fingers_count"] = int(finger_counts.sum())
+        detection_data["buttons_active"] = self.show_buttons
+
+        # Process button touches if buttons are active, looking up every
+        # index fingertip in the widget grid at once
+        touches = {}
+        if self.show_buttons and result.num_hands:
+            index_tips = pixels[:, handLandmarks.INDEX_FINGER_TIP]
+            for hand_idx, widget_idx in zip(*self.widgets.hit_test(index_tips)):
+                touches.setdefault(int(widget_idx), (int(hand_idx), tuple(index_tips[hand_idx].tolist())))
+            for widget_idx in touches:
+                result.touched_buttons.append(self.widgets.widgets[widget_idx])
+                detection_data["touched_button"] = self.widgets.names[widget_idx]
+
+        # One press and one release per touch, not an event every frame a
+        # finger stays on a widget
+        if self.show_buttons:
+            touch_events = self.touch_tracker.update(touches, now)
+        else:
+            touch_events = self.touch_tracker.reset(now)
+        for touch in touch_events:
+            widget = self.widgets.get(touch["widget"])
+            if touch["type"] == "dwell":
+                events.append(self._handle_touch(widget, tuple(touch["position"]), result, touch["hand_idx"], now))
+            elif touch["type"] == "exit" and touch["pressed"]:
+                events.append(self.events.emit(
+                    "button_release", now, button=widget.name, action=False,
+                    hand=self._hand_label(result, touch["hand_idx"])
+                ))
+
+        # Everything that happened on this frame, also already sent to subscribers
+        detection_data["events"] = events
+
+        return result
+
+    def _infer(self, frame):
+        """Run MediaPipe on a BGR frame.
+
+        Returns (landmarks, handedness, hand_landmarks): the (num_hands, 21, 3)
+        array, handedness labels and the raw protobufs (None if unavailable).
+        """
+        rgb_frame = self._buffer("rgb", frame.shape)
         rgb_frame.flags.writeable = True
-        
-        # Variables to track finger counts
-        total_fingers = 0
-        five_finger_detected = False
-        any_fingers_detected = False
-        
-        # Draw hand landmarks on the frame and count fingers
-        if results.multi_hand_landmarks:
-            detection_data["num_hands"] = len(results.multi_hand_landmarks)
-            
-            for hand_idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                # Count fingers for this hand
-                finger_count = self._count_fingers(hand_landmarks)
-                total_fingers += finger_count
-                
-                # Check if this hand has 5 fingers extended
-                if finger_count == 5:
-                    five_finger_detected = True
-                
-                # Check if any fingers are detected
-                if finger_count > 0:
-                    any_fingers_detected = True
-        
-            # Store hand data
-            hand_data = {
-                "id": hand_idx,
-                "fingers": finger_count
-            }
-            detection_data["hands"].append(hand_data)
-            
+        with metrics.timer("cvtcolor"):
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_frame)
+        rgb_frame.flags.writeable = False
+        if self.hands_pool is not None:
+            with self.hands_pool.graph(self, self.profile) as hands, metrics.timer("hands_process"):
+                results = hands.process(rgb_frame)
+        else:
+            with metrics.timer("hands_process"):
+                results = self.hands.process(rgb_frame)
+
+        # Convert once per frame, everything after this works on the landmark array
+        return (
+            handLandmarks.landmarks_to_array(results.multi_hand_landmarks),
+            handLandmarks.handedness_labels(results.multi_handedness),
+            results.multi_hand_landmarks
+        )
+
+    def _run_inference(self, frame):
+        """Run inference on the ROI around the last hands, or on the full frame"""
+        if self.roi:
+            box = self._next_roi(frame)
+            if box is not None:
+                x0, y0, x1, y1 = box
+                landmarks, handedness, _ = self._infer_scaled(frame[y0:y1, x0:x1])
+                if len(landmarks):
+                    self.frames_since_full_search += 1
+                    h, w = frame.shape[:2]
+                    # Crop protobufs are in crop coordinates, render rebuilds them from the array
+                    return handLandmarks.crop_to_frame(landmarks, box, w, h), handedness, None
+                # The hand left the ROI, search the whole frame right away
+
+        self.frames_since_full_search = 0
+        return self._infer_scaled(frame)
+
+    def _next_roi(self, frame):
+        """Crop box for this frame, or None when a full-frame search is due"""
+        if self.last_landmarks is None or len(self.last_landmarks) == 0:
+            return None
+        if self.frames_since_full_search >= self.roi_full_search_interval:
+            return None
+        h, w = frame.shape[:2]
+        box = handLandmarks.padded_bounding_box(self.last_landmarks, w, h)
+        if (box[2] - box[0]) * (box[3] - box[1]) >= 0.75 * w * h:
+            # Hands cover most of the frame, cropping wouldn't save anything
+            return None
+        return box
+
+    def _infer_scaled(self, frame):
+        """Downscale the frame to the inference size, run _infer and time it"""
+        scale = self.scaler.scale if self.scaler is not None else self.inference_scale
+        scale = min(1.0, scale * self.input_reduction)
+        if scale != 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+        start = time.perf_counter()
+        output = self._infer(frame)
+        if self.scaler is not None:
+            self.scaler.record(time.perf_counter() - start)
+        return output
+
+    def _infer_or_track(self, frame):
+        """Optical flow tracking between periodic full detections"""
+        gray = self.tracker.prepare(frame)
+        if not self.tracker.should_detect():
+            landmarks = self.tracker.track(gray)
+            if landmarks is not None:
+                return landmarks, self.tracker.handedness, None, "tracked"
+
+        landmarks, handedness, hand_landmarks = self._run_inference(frame)
+        self.tracker.reset(gray, landmarks, handedness)
+        return landmarks, handedness, hand_landmarks, "detected"
+
+    def _handle_touch(self, widget, finger_pos, result, hand_idx, now):
+        ix, iy = finger_pos
+        finger_count = int(result.finger_counts[hand_idx])
+        print(f"Touch detected on {widget.name} button at ({ix}, {iy})")
+        # Same fields Node-RED always got for a touch, now sent once per press.
+        # The widget payload may override any of them, so it is passed as a
+        # dict rather than as keyword arguments
+        return self.events.emit("button_press", now, {
+            "button": widget.name,
+            "action": True,
+            "fingers": finger_count,
+            "hand": self._hand_label(result, hand_idx),
+            **widget.payload
+        })
+
+    @staticmethod
+    def _hand_label(result, hand_idx):
+        return result.handedness[hand_idx] if hand_idx < len(result.handedness) else None
+
+    def render(self, frame, result):
+        """Draw landmarks, finger counts, coordinates and buttons for a HandResult"""
+        pixels = result.pixels
+
+        for hand_idx, finger_count in enumerate(result.finger_counts):
             # Display finger count near the hand
-            h, w, _ = frame.shape
-            wrist = hand_landmarks.landmark[self.mp_hands.HandLandmark.WRIST]
-            wrist_x, wrist_y = int(wrist.x * w), int(wrist.y * h)
-            
+            wrist_x, wrist_y = pixels[hand_idx, handLandmarks.WRIST].tolist()
+
             # Draw the finger count near the wrist
             cv2.putText(
                 frame, 
@@ -133,69 +520,20 @@ class HandDetection:
                 (255, 255, 255), 
                 2
             )
-            
-            # Display hand coordinates at the right bottom but above the text
-            index_finger_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-            ix, iy = int(index_finger_tip.x * w), int(index_finger_tip.y * h)
-            
-            # Position the coordinates display at the right bottom
-            coords_text_x = f"X: {ix}"
-            coords_text_y = f"Y: {iy}"
-
-            # Get the size of both text lines to determine the background rectangle dimensions
-            (x_width, x_height), _ = cv2.getTextSize(
-                coords_text_x,
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                1
-            )
-            (y_width, y_height), _ = cv2.getTextSize(
-                coords_text_y,
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                1
-            )
-
-            # Calculate the maximum width needed
-            max_width = max(x_width, y_width)
-            total_height = x_height + y_height + 5  # 5 pixels spacing between lines
-
-            # Place at right bottom, above the instruction text
-            coords_x = w - max_width - 50  # 10 pixels from right edge
-            coords_y_first_line = h - 100  # First line position
-            coords_y_second_line = coords_y_first_line + x_height + 5  # Second line position
 
-            # Draw background for better visibility
-            cv2.rectangle(
-                frame,
-                (coords_x - 5, coords_y_first_line - x_height - 5),
-                (coords_x + max_width + 5, coords_y_second_line + 5),
-                (0, 0, 0, 128),
-                cv2.FILLED
-            )
+            # Display hand coordinates at the right bottom but above the text
+            ix, iy = pixels[hand_idx, handLandmarks.INDEX_FINGER_TIP].tolist()
+            self._draw_coordinates(frame, ix, iy)
 
-            # Draw the coordinates text (X on first line, Y on second line)
-            cv2.putText(
-                frame,
-                coords_text_x,
-                (coords_x, coords_y_first_line),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                (100, 255, 255),  # Yellow-cyan color for visibility
-                1
-            )
+            if self.landmark_renderer is not None:
+                continue
 
-            cv2.putText(
-                frame,
-                coords_text_y,
-                (coords_x, coords_y_second_line),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                (100, 255, 255),  # Yellow-cyan color for visibility
-                1
-            )
-            
-            # Draw hand landmarks
+            # Draw hand landmarks, rebuilding the protobuf when the result
+            # only carries the landmark array (e.g. from a worker process)
+            if hand_idx < len(result.hand_landmarks):
+                hand_landmarks = result.hand_landmarks[hand_idx]
+            else:
+                hand_landmarks = handLandmarks.to_landmark_list(result.landmarks[hand_idx])
             self.mp_draw.draw_landmarks(
                 frame,
                 hand_landmarks,
@@ -203,144 +541,115 @@ class HandDetection:
                 self.mp_drawing_styles.get_default_hand_landmarks_style(),
                 self.mp_drawing_styles.get_default_hand_connections_style()
             )
-    
-            # Update button visibility based on detection
-            if not self.show_buttons and five_finger_detected:
-                # Only activate buttons if 5 fingers are detected and buttons are not already active
-                self.show_buttons = True
-                print("5 fingers detected - showing buttons")
-                
-            if any_fingers_detected:
-                # Update the timestamp as long as any fingers are detected
-                self.last_hand_detected_time = time.time()
-    
-        # If no fingers detected for 5 seconds, hide buttons
-        if self.show_buttons and time.time() - self.last_hand_detected_time > 5:
-            self.show_buttons = False
-            print("No fingers detected for 5 seconds - hiding buttons")
-    
-        # Store total finger count
-        detection_data["fingers_count"] = total_fingers
-        detection_data["buttons_active"] = self.show_buttons
-        
-        # Draw buttons only if they should be shown
-        if self.show_buttons:
+
+        if self.landmark_renderer is not None:
+            self.landmark_renderer.draw(frame, pixels)
+
+        # Buttons, instruction text and touch feedback come from cached layers
+        touched = tuple(sorted({widget.name for widget in result.touched_buttons}))
+        self.overlay.blend(frame, (result.detection_data["buttons_active"], touched), self.widgets.layout_key())
+
+        return frame
+
+    def _draw_overlay(self, frame, state):
+        """Draw one static UI state, called by the compositor to build its layers"""
+        buttons_active, touched = state
+        if buttons_active:
             # Add a visual cue for button status
             text = "Buttons Enabled - Hide hands for 5s to deactivate"
-            # Get the size of the text to properly center it
-            (text_width, text_height), baseline = cv2.getTextSize(
-                text,
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                2
-            )
-            # Calculate center position
-            text_x = (frame.shape[1] - text_width) // 2
-            text_y = frame.shape[0] - 30
-            
-            cv2.putText(
-                frame,
-                text,
-                (text_x, text_y),  
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (0, 255, 0),
-                2
-            )
-            
-            cv2.rectangle(
-                frame, 
-                self.button_left["pos"], 
-                (
-                    self.button_left["pos"][0] + self.button_left["size"][0], 
-                    self.button_left["pos"][1] + self.button_left["size"][1]), 
-                    self.button_left["color"], 
-                    cv2.FILLED
-                )
-            cv2.rectangle(
-                frame, 
-                self.button_right["pos"], 
-                (
-                    self.button_right["pos"][0] + self.button_right["size"][0], 
-                    self.button_right["pos"][1] + self.button_right["size"][1]
-                ), 
-                self.button_right["color"], 
-                cv2.FILLED
-            )
+            color = (0, 255, 0)
         else:
             # Show instruction when buttons aren't visible
             text = "Show 5 fingers to activate buttons"
-            # Get the size of the text to properly center it
-            (text_width, text_height), baseline = cv2.getTextSize(
-                text,
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                2
-            )
-            # Calculate center position
-            text_x = (frame.shape[1] - text_width) // 2
-            text_y = frame.shape[0] - 30
-            
-            cv2.putText(
-                frame,
-                text,
-                (text_x, text_y),  
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (200, 200, 200),
-                2
-            )
+            color = (200, 200, 200)
+
+        # Get the size of the text to properly center it
+        (text_width, text_height), baseline = cv2.getTextSize(
+            text,
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.7,
+            2
+        )
+        # Calculate center position
+        text_x = (frame.shape[1] - text_width) // 2
+        text_y = frame.shape[0] - 30
+
+        cv2.putText(
+            frame,
+            text,
+            (text_x, text_y),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.7,
+            color,
+            2
+        )
+
+        if buttons_active:
+            for widget in self.widgets.widgets:
+                # Visual feedback - touched buttons are drawn white
+                widget.draw(frame, (255, 255, 255) if widget.name in touched else None)
+
+    def _draw_coordinates(self, frame, ix, iy):
+        h, w, _ = frame.shape
+
+        # Position the coordinates display at the right bottom
+        coords_text_x = f"X: {ix}"
+        coords_text_y = f"Y: {iy}"
 
-        # Process button touches if buttons are active
-        if self.show_buttons and results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                h, w, _ = frame.shape
-                
-                # Get index finger tip position
-                index_finger_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                ix, iy = int(index_finger_tip.x * w), int(index_finger_tip.y * h)
-                
-                # Check for button touch
-                if self._is_touching((ix, iy), self.button_left):
-                    # Visual feedback - change button color temporarily
-                    cv2.rectangle(frame, self.button_left["pos"], 
-                        (self.button_left["pos"][0] + self.button_left["size"][0], 
-                         self.button_left["pos"][1] + self.button_left["size"][1]), 
-                        (255, 255, 255), cv2.FILLED)
-                    
-                    finger_count = self._count_fingers(hand_landmarks)
-                    print(f"Touch detected on {self.button_left['name']} button at ({ix}, {iy})")
-                    detection_data["touched_button"] = self.button_left["name"]
-                    if self.nodeRedClient:
-                        try:
-                            self.nodeRedClient.sendData({"button": self.button_left["name"], "action": True, "fingers": finger_count})
-                            print(f"Data sent to Node-RED: {self.button_left['name']} with {finger_count} fingers")
-                        except Exception as e:
-                            print(f"Error sending data to Node-RED: {e}")
-                    else:
-                        print("NodeRedClient is not initialized")
-                
-                # Same for right button...
-                if self._is_touching((ix, iy), self.button_right):
-                    # Visual feedback - change button color temporarily
-                    cv2.rectangle(frame, self.button_right["pos"], 
-                        (self.button_right["pos"][0] + self.button_right["size"][0], 
-                         self.button_right["pos"][1] + self.button_right["size"][1]), 
-                        (255, 255, 255), cv2.FILLED)
-                    
-                    finger_count = self._count_fingers(hand_landmarks)
-                    print(f"Touch detected on {self.button_right['name']} button at ({ix}, {iy})")
-                    detection_data["touched_button"] = self.button_right["name"]
-                    if self.nodeRedClient:
-                        try:
-                            self.nodeRedClient.sendData({"button": self.button_right["name"], "action": True, "fingers": finger_count})
-                            print(f"Data sent to Node-RED: {self.button_right['name']} with {finger_count} fingers")
-                        except Exception as e:
-                            print(f"Error sending data to Node-RED: {e}")
-                    else:
-                        print("NodeRedClient is not initialized")
-
-        return frame, detection_data
+        # Get the size of both text lines to determine the background rectangle dimensions
+        (x_width, x_height), _ = cv2.getTextSize(
+            coords_text_x,
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.6,
+            1
+        )
+        (y_width, y_height), _ = cv2.getTextSize(
+            coords_text_y,
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.6,
+            1
+        )
+
+        # Calculate the maximum width needed
+        max_width = max(x_width, y_width)
+
+        # Place at right bottom, above the instruction text
+        coords_x = w - max_width - 50  # 10 pixels from right edge
+        coords_y_first_line = h - 100  # First line position
+        coords_y_second_line = coords_y_first_line + x_height + 5  # Second line position
+
+        # Draw background for better visibility
+        cv2.rectangle(
+            frame,
+            (coords_x - 5, coords_y_first_line - x_height - 5),
+            (coords_x + max_width + 5, coords_y_second_line + 5),
+            (0, 0, 0, 128),
+            cv2.FILLED
+        )
+
+        # Draw the coordinates text (X on first line, Y on second line)
+        cv2.putText(
+            frame,
+            coords_text_x,
+            (coords_x, coords_y_first_line),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.6,
+            (100, 255, 255),  # Yellow-cyan color for visibility
+            1
+        )
+
+        cv2.putText(
+            frame,
+            coords_text_y,
+            (coords_x, coords_y_second_line),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.6,
+            (100, 255, 255),  # Yellow-cyan color for visibility
+            1
+        )
 
     def close(self):
-        self.hands.close()
\ No newline at end of file
+        for hands in self.hands_cache.values():
+            if hands is not None:
+                hands.close()
+        self.hands_cache.clear()
\ No newline at end of file
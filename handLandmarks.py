@@ -0,0 +1,115 @@
+import numpy as np
+
+
+# MediaPipe hand landmark indices
+WRIST = 0
+THUMB_IP = 3
+THUMB_TIP = 4
+INDEX_FINGER_PIP = 6
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_PIP = 10
+MIDDLE_FINGER_TIP = 12
+RING_FINGER_PIP = 14
+RING_FINGER_TIP = 16
+PINKY_PIP = 18
+PINKY_TIP = 20
+
+NUM_LANDMARKS = 21
+
+# Fingertips and the middle knuckle each is compared against (thumb excluded)
+FINGER_TIPS = [INDEX_FINGER_TIP, MIDDLE_FINGER_TIP, RING_FINGER_TIP, PINKY_TIP]
+FINGER_KNUCKLES = [INDEX_FINGER_PIP, MIDDLE_FINGER_PIP, RING_FINGER_PIP, PINKY_PIP]
+ALL_FINGER_TIPS = [THUMB_TIP] + FINGER_TIPS
+
+
+def empty_landmarks():
+    return np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32)
+
+
+def landmarks_to_array(multi_hand_landmarks):
+    """Convert MediaPipe results to a (num_hands, 21, 3) float32 array of normalized x, y, z"""
+    if not multi_hand_landmarks:
+        return empty_landmarks()
+    return np.array(
+        [[(p.x, p.y, p.z) for p in hand.landmark] for hand in multi_hand_landmarks],
+        dtype=np.float32
+    )
+
+
+def handedness_labels(multi_handedness):
+    """Handedness label ("Left" or "Right") per hand, in landmark order"""
+    if not multi_handedness:
+        return []
+    return [hand.classification[0].label for hand in multi_handedness]
+
+
+def count_fingers(landmarks):
+    """Extended finger count per hand for a (num_hands, 21, 3) array.
+
+    The thumb counts as extended when its tip is left of the index knuckle,
+    other fingers when their tip is above their middle knuckle.
+    """
+    if len(landmarks) == 0:
+        return np.zeros(0, dtype=np.int32)
+    thumb = landmarks[:, THUMB_TIP, 0] < landmarks[:, INDEX_FINGER_PIP, 0]
+    fingers = landmarks[:, FINGER_TIPS, 1] < landmarks[:, FINGER_KNUCKLES, 1]
+    return thumb.astype(np.int32) + fingers.sum(axis=1, dtype=np.int32)
+
+
+def mirror_landmarks(landmarks):
+    """Landmarks of a horizontally flipped image: x becomes 1 - x"""
+    mirrored = landmarks.copy()
+    mirrored[..., 0] = 1.0 - mirrored[..., 0]
+    return mirrored
+
+
+def mirror_handedness(labels):
+    swap = {"Left": "Right", "Right": "Left"}
+    return [swap.get(label, label) for label in labels]
+
+
+def to_landmark_list(hand):
+    """Rebuild a MediaPipe NormalizedLandmarkList from one (21, 3) hand, for mp_draw"""
+    from mediapipe.framework.formats import landmark_pb2
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in hand.tolist():
+        landmark = landmark_list.landmark.add()
+        landmark.x, landmark.y, landmark.z = x, y, z
+    return landmark_list
+
+
+def to_pixels(landmarks, width, height):
+    """Integer pixel x, y for normalized landmarks of any leading shape"""
+    # Scale in float64 so truncation matches int(landmark.x * width) exactly
+    return (landmarks[..., :2] * np.array([width, height], dtype=np.float64)).astype(np.int32)
+
+
+def padded_bounding_box(landmarks, width, height, padding=0.5, min_size=160, align=16):
+    """Pixel box (x0, y0, x1, y1) around all hands, grown by `padding` of its size.
+
+    The box is at least min_size wide and high, snapped to `align` pixels
+    so small hand movements don't change the crop every frame, and clamped
+    to the frame.
+    """
+    points = landmarks[..., :2].reshape(-1, 2) * np.array([width, height], dtype=np.float32)
+    (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    half_w = max((x1 - x0) * (1 + padding), min_size) / 2
+    half_h = max((y1 - y0) * (1 + padding), min_size) / 2
+
+    x0 = max(0, int((cx - half_w) // align * align))
+    y0 = max(0, int((cy - half_h) // align * align))
+    x1 = min(width, int(-(-(cx + half_w) // align) * align))
+    y1 = min(height, int(-(-(cy + half_h) // align) * align))
+    return x0, y0, x1, y1
+
+
+def crop_to_frame(landmarks, box, width, height):
+    """Map landmarks normalized to a crop box back to full-frame normalized coordinates"""
+    x0, y0, x1, y1 = box
+    mapped = landmarks.copy()
+    mapped[..., 0] = (landmarks[..., 0] * (x1 - x0) + x0) / width
+    mapped[..., 1] = (landmarks[..., 1] * (y1 - y0) + y0) / height
+    # z is relative to the wrist and scaled like x
+    mapped[..., 2] = landmarks[..., 2] * (x1 - x0) / width
+    return mapped
@@ -0,0 +1,95 @@
+import cv2
+import numpy as np
+
+
+class LandmarkTracker:
+    """Propagates hand landmarks between full detections with optical flow.
+
+    Full MediaPipe inference runs every `interval` frames; in between the
+    21 landmarks per hand are moved with pyramidal Lucas-Kanade flow on a
+    downscaled grayscale frame. The interval grows while hands are still
+    and shrinks when they move fast, and tracking is abandoned (forcing a
+    detection) as soon as too many points are lost.
+    """
+
+    def __init__(self, min_interval=2, max_interval=6, scale=0.5, win_size=(15, 15), max_level=2,
+                 min_tracked_ratio=0.85, max_error=20.0, slow_motion=0.004, fast_motion=0.02):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.scale = scale
+        self.lk_params = dict(
+            winSize=win_size,
+            maxLevel=max_level,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+        )
+        self.min_tracked_ratio = min_tracked_ratio
+        self.max_error = max_error
+        # Median landmark displacement per frame, as a fraction of the frame width
+        self.slow_motion = slow_motion
+        self.fast_motion = fast_motion
+
+        self.interval = min_interval
+        self.frames_since_detection = 0
+        self.prev_gray = None
+        self.landmarks = None
+        self.handedness = []
+        self.motion = 0.0
+
+    def prepare(self, frame):
+        """Small grayscale copy of a BGR frame for flow computation"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.scale != 1.0:
+            gray = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return gray
+
+    def should_detect(self):
+        """True when this frame needs full inference instead of tracking"""
+        if self.landmarks is None or len(self.landmarks) == 0:
+            # Nothing to track, keep searching for hands every frame
+            return True
+        return self.frames_since_detection + 1 >= self.interval
+
+    def reset(self, gray, landmarks, handedness):
+        """Start tracking from a fresh detection"""
+        self.prev_gray = gray
+        self.landmarks = landmarks
+        self.handedness = handedness
+        self.frames_since_detection = 0
+
+    def track(self, gray):
+        """Move the last landmarks onto this frame, or None if tracking failed"""
+        if self.prev_gray is None or self.prev_gray.shape != gray.shape:
+            return None
+
+        h, w = gray.shape
+        size = np.array([w, h], dtype=np.float32)
+        points = (self.landmarks[..., :2] * size).reshape(-1, 1, 2).astype(np.float32)
+        new_points, status, error = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, points, None, **self.lk_params)
+
+        good = (status.ravel() == 1) & (error.ravel() < self.max_error)
+        if good.mean() < self.min_tracked_ratio:
+            # Tracking confidence dropped, detect more often for a while
+            self.interval = self.min_interval
+            return None
+
+        # Lost points keep their previous position
+        new_points = new_points.reshape(-1, 2)
+        points = points.reshape(-1, 2)
+        new_points[~good] = points[~good]
+
+        displacement = np.linalg.norm(new_points[good] - points[good], axis=1)
+        self.motion = float(np.median(displacement)) / w
+        self._adapt_interval()
+
+        landmarks = self.landmarks.copy()
+        landmarks[..., :2] = (new_points / size).reshape(landmarks.shape[0], -1, 2)
+        self.landmarks = landmarks
+        self.prev_gray = gray
+        self.frames_since_detection += 1
+        return landmarks
+
+    def _adapt_interval(self):
+        if self.motion > self.fast_motion:
+            self.interval = max(self.min_interval, self.interval // 2)
+        elif self.motion < self.slow_motion:
+            self.interval = min(self.max_interval, self.interval + 1)
@@ -1,36 +1,43 @@
 import cv2 as cv
 import base64
 import numpy as np
-from handDetection import HandDetection
+from sessionPool import SessionPool
+from metrics import metrics
 
 class ImageProcessing:
-    def __init__(self, handDetector: HandDetection):
-        self.handDetector = handDetector
+    def __init__(self, sessions: SessionPool):
+        # Each client session gets its own detector from the pool
+        self.sessions = sessions
 
-    def handleFrame(self, data, socketIo):
-        # Decode base64 image
-        imageData = data.split(',')[1]
-        imageBytes = base64.b64decode(imageData)
-        npArr = np.frombuffer(imageBytes, np.uint8)
+    def handleFrame(self, data, socketIo, sid):
+        # JPEG bytes from a binary attachment, or a base64 data: URL
+        if isinstance(data, str):
+            data = base64.b64decode(data.split(',')[1])
+        npArr = np.frombuffer(data, np.uint8)
         frame = cv.imdecode(npArr, cv.IMREAD_COLOR)
 
-        # Process frame with hand detector
-        processedFrame, detection_data = self.handDetector.process_frame(frame)
+        # Process frame with this session's hand detector
+        with self.sessions.session(sid) as handDetector:
+            if handDetector is None:
+                # Still busy with this client's previous frame, or every
+                # detector is in use: drop it, the client sends the next one
+                return
+            processedFrame, detection_data = handDetector.process_frame(frame)
 
-        # Encode processed frame to send back
-        ret, buffer = cv.imencode(
-            '.jpg', 
-            processedFrame,
-            [
-                cv.IMWRITE_JPEG_QUALITY, 
-                90
-            ]
-        )
+            # Encode processed frame to send back
+            with metrics.timer("imencode"):
+                ret, buffer = cv.imencode(
+                    '.jpg', 
+                    processedFrame,
+                    [
+                        cv.IMWRITE_JPEG_QUALITY, 
+                        90
+                    ]
+                )
 
         if ret:
-            processedImage = base64.b64encode(buffer).decode('utf-8')
+            # Raw JPEG bytes go out as a Socket.IO binary attachment
             socketIo.emit('processed_frame', {
-                "image": f'data:image/jpeg;base64,{processedImage}',
+                "image": buffer.tobytes(),
                 "detection_data": detection_data
-            })
-
+            }, to=sid)
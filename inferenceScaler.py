@@ -0,0 +1,46 @@
+from collections import deque
+
+import numpy as np
+
+
+class InferenceScaler:
+    """Picks the MediaPipe input scale from a per-frame latency budget.
+
+    Keeps a rolling window of measured inference times. When the window's
+    p95 exceeds the budget the next smaller scale is used; when it stays
+    well below the budget the scale steps back up. The window restarts
+    after every change so each decision is based on the new scale only.
+    """
+
+    def __init__(self, budget_ms, scales=(1.0, 0.75, 0.5, 0.35), window=30, headroom=0.6):
+        self.budget = budget_ms / 1000.0
+        self.scales = sorted(scales, reverse=True)
+        self.window = window
+        self.headroom = headroom
+        self.level = 0
+        self.samples = deque(maxlen=window)
+
+    @property
+    def scale(self):
+        return self.scales[self.level]
+
+    def p95(self):
+        if not self.samples:
+            return 0.0
+        return float(np.percentile(self.samples, 95))
+
+    def record(self, seconds):
+        """Add one inference time measurement and adjust the scale if needed"""
+        self.samples.append(seconds)
+        if len(self.samples) < self.window:
+            return
+
+        p95 = self.p95()
+        if p95 > self.budget and self.level < len(self.scales) - 1:
+            self.level += 1
+            print(f"⏬ Inference p95 {p95 * 1000:.1f} ms over budget, scale {self.scale}")
+            self.samples.clear()
+        elif p95 < self.budget * self.headroom and self.level > 0:
+            self.level -= 1
+            print(f"⏫ Inference p95 {p95 * 1000:.1f} ms within budget, scale {self.scale}")
+            self.samples.clear()
@@ -0,0 +1,136 @@
+import cv2
+import numpy as np
+
+
+# MediaPipe's default hand style (drawing_styles.get_default_hand_*_style)
+RED = (48, 48, 255)
+PEACH = (180, 229, 255)
+PURPLE = (128, 64, 128)
+YELLOW = (0, 204, 255)
+GREEN = (48, 255, 48)
+BLUE = (192, 101, 21)
+GRAY = (128, 128, 128)
+
+# (color, thickness, connections) per connection group, palm first
+CONNECTION_STYLES = [
+    (GRAY, 3, [(0, 1), (0, 5), (5, 9), (9, 13), (13, 17), (0, 17)]),
+    (PEACH, 2, [(1, 2), (2, 3), (3, 4)]),
+    (PURPLE, 2, [(5, 6), (6, 7), (7, 8)]),
+    (YELLOW, 2, [(9, 10), (10, 11), (11, 12)]),
+    (GREEN, 2, [(13, 14), (14, 15), (15, 16)]),
+    (BLUE, 2, [(17, 18), (18, 19), (19, 20)]),
+]
+
+# Fill color per landmark: palm joints (wrist and finger bases) are red,
+# the rest take their finger's color
+JOINT_COLORS = np.array(
+    [RED, RED, PEACH, PEACH, PEACH] +
+    [color for finger in (PURPLE, YELLOW, GREEN, BLUE) for color in (RED, finger, finger, finger)],
+    dtype=np.uint8
+)
+
+JOINT_RADIUS = 5
+# Same border rule as mp_draw: max(radius + 1, int(radius * 1.2))
+JOINT_BORDER_RADIUS = max(JOINT_RADIUS + 1, int(JOINT_RADIUS * 1.2))
+JOINT_BORDER_COLOR = (224, 224, 224)
+
+# One whole BGR pixel, lets numpy scatter pixels instead of single bytes
+PIXEL = np.dtype((np.void, 3))
+
+
+def _joint_sprite():
+    """Pixel offsets of a joint dot and whether each one is border or fill"""
+    size = 2 * JOINT_BORDER_RADIUS + 1
+    center = (JOINT_BORDER_RADIUS, JOINT_BORDER_RADIUS)
+    sprite = np.zeros((size, size), dtype=np.uint8)
+    cv2.circle(sprite, center, JOINT_BORDER_RADIUS, 1, cv2.FILLED)
+    cv2.circle(sprite, center, JOINT_RADIUS, 2, cv2.FILLED)
+    dy, dx = np.nonzero(sprite)
+    offsets = np.stack([dx, dy], axis=1).astype(np.int32) - JOINT_BORDER_RADIUS
+    return offsets, sprite[dy, dx] == 2
+
+
+class LandmarkRenderer:
+    """Draws hand skeletons for a whole (num_hands, 21, 2) pixel array at once.
+
+    Connections of every hand are drawn with one cv2.polylines call per
+    style group (six in total, each group has its own color and thickness)
+    and all joint dots are stamped with a single numpy scatter of a
+    pre-rasterized dot, instead of mp_draw's per-landmark cv2 calls. Colors,
+    thicknesses and dot sizes follow MediaPipe's default hand style.
+    """
+
+    def __init__(self):
+        # All connections in one array so every frame needs a single gather,
+        # each style then draws its slice of it
+        self.connections = np.array(
+            [pair for _, _, pairs in CONNECTION_STYLES for pair in pairs], dtype=np.intp
+        )
+        self.styles = []
+        start = 0
+        for color, thickness, pairs in CONNECTION_STYLES:
+            self.styles.append((color, thickness, slice(start, start + len(pairs))))
+            start += len(pairs)
+
+        offsets, fill = _joint_sprite()
+        self.offsets = offsets
+        # Every sprite pixel's color for every landmark, one 3-byte void item
+        # per pixel so the stamp writes whole BGR pixels: (21, pixels)
+        sprite_colors = np.where(
+            fill[None, :, None],
+            JOINT_COLORS[:, None, :],
+            np.array(JOINT_BORDER_COLOR, dtype=np.uint8)
+        )
+        self.sprite_pixels = np.ascontiguousarray(sprite_colors).view(PIXEL)[..., 0]
+        self._flat_offsets = (None, None)
+
+    def _flat_sprite_offsets(self, width):
+        """Sprite offsets as flat pixel indices for frames of this width"""
+        if self._flat_offsets[0] != width:
+            self._flat_offsets = (width, self.offsets[:, 1] * width + self.offsets[:, 0])
+        return self._flat_offsets[1]
+
+    def draw(self, frame, pixels):
+        """Draw all hands onto a BGR frame in place.
+
+        pixels is a (num_hands, 21, 2) integer array of x, y coordinates.
+        Like mp_draw, landmarks outside the frame and their connections are
+        skipped.
+        """
+        if len(pixels) == 0:
+            return frame
+        h, w = frame.shape[:2]
+        size = np.array([w, h])
+        # mp_draw keeps points on the far edge (normalized 1.0) on the last pixel
+        visible = ((pixels >= 0) & (pixels <= size)).all(axis=-1)
+        points = np.minimum(pixels, size - 1).astype(np.int32)
+        all_visible = visible.all()
+
+        # (num_hands, num_connections, 2, 2) line segments
+        segments = points[:, self.connections]
+        if not all_visible:
+            keep = visible[:, self.connections].all(axis=-1)
+        for color, thickness, group in self.styles:
+            lines = segments[:, group].reshape(-1, 2, 2)
+            if not all_visible:
+                lines = lines[keep[:, group].ravel()]
+            if len(lines):
+                cv2.polylines(frame, list(lines), False, color, thickness)
+
+        # Stamp every joint dot with one scatter into the flat pixel array
+        hand_idx, landmark_idx = np.nonzero(visible)
+        dots = points[hand_idx, landmark_idx]
+        targets = (dots[:, 1] * w + dots[:, 0])[:, None] + self._flat_sprite_offsets(w)
+        colors = self.sprite_pixels[landmark_idx]
+        near_edge = ((dots < JOINT_BORDER_RADIUS) | (dots >= size - JOINT_BORDER_RADIUS)).any(axis=-1)
+        if near_edge.any():
+            # Drop the sprite pixels that fall off the frame (or wrap a row)
+            stamped = dots[:, None, :] + self.offsets
+            inside = ((stamped >= 0) & (stamped < size)).all(axis=-1)
+            targets, colors = targets[inside], colors[inside]
+
+        if frame.flags.c_contiguous:
+            np.put(frame.view(PIXEL).reshape(-1), targets, colors)
+        else:
+            frame.view(PIXEL).reshape(h, w)[np.unravel_index(targets, (h, w))] = colors
+        return frame
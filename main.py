@@ -1,17 +1,19 @@
-from camera import Camera
+from frameSource import create_frame_source
 from handDetection import HandDetection
 from nodeRedClient import NodeRedClient
 from serialClient import SerialClient
+from widgetRegistry import load_widgets
 
 import cv2 as cv
 import json
 import base64
+import config
 
 def main():
     clientUrl = "http://localhost:1880"
     clientSerial = "/dev/tty.usbserial-0001"
 
-    cam = Camera()
+    cam = create_frame_source(config.FRAME_SOURCES[0], config.FRAME_SOURCE_PACING)
     cam.openCamera()
 
     videoClient = NodeRedClient(
@@ -30,10 +32,26 @@ def main():
         timeout=1
     )
 
-    handDetector = HandDetection(nodeRedClient=handDataClient)
+    # Headless nodes only forward detection_data, no overlay or video is produced
+    handDetector = HandDetection(
+        nodeRedClient=handDataClient,
+        headless=config.HEADLESS,
+        tracking=config.HAND_TRACKING,
+        max_tracking_interval=config.HAND_TRACKING_MAX_INTERVAL,
+        inference_scale=config.INFERENCE_SCALE,
+        latency_budget_ms=config.LATENCY_BUDGET_MS,
+        roi=config.INFERENCE_ROI,
+        roi_full_search_interval=config.ROI_FULL_SEARCH_INTERVAL,
+        motion_gate=config.MOTION_GATE,
+        landmark_renderer=config.LANDMARK_RENDERER,
+        widgets=load_widgets(config.WIDGETS_FILE),
+        profile=config.DETECTION_PROFILE,
+        mirror=config.MIRROR_MODE
+    )
 
     count = 0
     flag = 0
+    last_seq = 0
     try:
         while True:
             flag += 1
@@ -43,14 +61,24 @@ def main():
                 count += 1
                 flag = 0
 
-            frame = cam.get_frame()
-            processedFrame = handDetector.process_frame(frame)
+            # Borrow each new frame without copying; headless detectors with a
+            # small inference scale only decode MJPEG frames at 1/2 or 1/4 size
+            lease = cam.wait_for_frame(last_seq, timeout=1.0)
+            if lease is None:
+                if not cam.is_opened():
+                    break
+                continue
+            last_seq = lease.seq
+            with lease:
+                processedFrame, detection_data = handDetector.process_lease(lease)
+                if config.HEADLESS:
+                    continue
 
-            ret, buffer = cv.imencode(
-                '.jpg',
-                processedFrame,
-                [cv.IMWRITE_JPEG_QUALITY, 90]
-            )
+                ret, buffer = cv.imencode(
+                    '.jpg',
+                    processedFrame,
+                    [cv.IMWRITE_JPEG_QUALITY, 90]
+                )
 
             if ret:
                 jpgAsText = base64.b64encode(buffer).decode('utf-8')
@@ -0,0 +1,150 @@
+import threading
+import time
+
+import numpy as np
+
+import config
+
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class RollingHistogram:
+    """Last `window` durations of one stage, plus lifetime count and sum.
+
+    Recording is a single store into a preallocated array; percentiles are
+    only computed when the metrics are read.
+    """
+
+    def __init__(self, window=1024):
+        self.samples = np.zeros(window, dtype=np.float64)
+        self.window = window
+        self.count = 0
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples[self.count % self.window] = seconds
+            self.count += 1
+            self.total += seconds
+
+    def summary(self):
+        with self.lock:
+            samples = self.samples[:min(self.count, self.window)].copy()
+            count, total = self.count, self.total
+        if len(samples):
+            values = np.percentile(samples, [q * 100 for q in QUANTILES])
+        else:
+            values = [0.0] * len(QUANTILES)
+        return {"quantiles": dict(zip(QUANTILES, (float(v) for v in values))), "count": count, "sum": total}
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Per-stage timing histograms labelled by camera.
+
+    Stages are timed with `with metrics.timer("stage"):`. The camera label
+    comes from the calling thread (see set_camera), so code deep in the
+    pipeline doesn't need to know which camera it is working for.
+    """
+
+    def __init__(self, enabled=True, window=1024):
+        self.enabled = enabled
+        self.window = window
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def set_camera(self, camera):
+        """Label everything this thread times from now on with a camera id"""
+        self.local.camera = str(camera)
+
+    def histogram(self, stage):
+        key = (stage, getattr(self.local, "camera", ""))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(key, RollingHistogram(self.window))
+        return histogram
+
+    def timer(self, stage):
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self.histogram(stage))
+
+    def record(self, stage, seconds):
+        if self.enabled:
+            self.histogram(stage).record(seconds)
+
+    def snapshot(self):
+        """{camera: {stage: {"p50", "p95", "p99" (ms), "count"}}}"""
+        with self.lock:
+            items = list(self.histograms.items())
+        snapshot = {}
+        for (stage, camera), histogram in items:
+            summary = histogram.summary()
+            stats = {f"p{int(q * 100)}": round(v * 1000, 2) for q, v in summary["quantiles"].items()}
+            stats["count"] = summary["count"]
+            snapshot.setdefault(camera or "-", {})[stage] = stats
+        return snapshot
+
+    def prometheus(self, camera_stats=None):
+        """Prometheus text exposition of the stage timings and camera counters"""
+        with self.lock:
+            items = sorted(self.histograms.items())
+        lines = [
+            "# HELP hand_detection_stage_seconds Time spent per pipeline stage",
+            "# TYPE hand_detection_stage_seconds summary",
+        ]
+        for (stage, camera), histogram in items:
+            summary = histogram.summary()
+            labels = f'stage="{stage}",camera="{camera}"'
+            for q, value in summary["quantiles"].items():
+                lines.append(f'hand_detection_stage_seconds{{{labels},quantile="{q}"}} {value:.6f}')
+            lines.append(f"hand_detection_stage_seconds_sum{{{labels}}} {summary['sum']:.6f}")
+            lines.append(f"hand_detection_stage_seconds_count{{{labels}}} {summary['count']}")
+
+        counters = [
+            ("frames_processed_total", "counter", "processed", "Frames run through detection"),
+            ("frames_dropped_total", "counter", "dropped", "Camera frames skipped because processing was behind"),
+            ("capture_dropped_total", "counter", "capture_dropped", "Frames the capture thread dropped, all buffers busy"),
+            ("fps", "gauge", "fps", "Processed frames per second"),
+        ]
+        for name, kind, key, description in counters:
+            lines.append(f"# HELP hand_detection_{name} {description}")
+            lines.append(f"# TYPE hand_detection_{name} {kind}")
+            for camera, stats in (camera_stats or {}).items():
+                lines.append(f'hand_detection_{name}{{camera="{camera}"}} {stats.get(key, 0)}')
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry, like config the modules just import it
+metrics = Metrics(enabled=config.METRICS)
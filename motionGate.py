@@ -0,0 +1,45 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Cheap scene-change test used to skip inference on static frames.
+
+    Each frame is shrunk to a tiny grayscale thumbnail and compared with
+    the thumbnail of the last frame that was actually inferred, so slow
+    changes still add up and eventually trigger inference. A frame is
+    static when fewer than `changed_fraction` of the thumbnail pixels
+    differ by more than `pixel_threshold`. After max_gated_frames in a row
+    inference runs anyway.
+    """
+
+    def __init__(self, size=(32, 24), pixel_threshold=12, changed_fraction=0.01, max_gated_frames=150):
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.max_gated_frames = max_gated_frames
+        self.reference = None
+        self.gated_run = 0
+        self.gated = 0
+        self.inferred = 0
+
+    def is_static(self, frame):
+        """True if inference can be skipped; otherwise this frame becomes the new reference"""
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        thumbnail = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        comparable = self.reference is not None and thumbnail.shape == self.reference.shape
+        if comparable and self.gated_run < self.max_gated_frames:
+            changed = cv2.absdiff(thumbnail, self.reference) > self.pixel_threshold
+            if np.count_nonzero(changed) < self.changed_fraction * changed.size:
+                self.gated_run += 1
+                self.gated += 1
+                return True
+
+        self.reference = thumbnail
+        self.gated_run = 0
+        self.inferred += 1
+        return False
+
+    def stats(self):
+        return {"gated": self.gated, "inferred": self.inferred}
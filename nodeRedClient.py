@@ -1,17 +1,26 @@
 import requests
 import json
+import queue
 import time
-from threading import Thread
+from threading import Lock, Thread
 
 from numpy.distutils.conv_template import header
 
+from metrics import metrics
+
 
 class NodeRedClient:
-    def __init__(self, nodeRedUrl="http://localhost:1880", targetUrl="", sendInterval=0.1):
+    def __init__(self, nodeRedUrl="http://localhost:1880", targetUrl="", sendInterval=0.1, eventRetries=2):
         self.nodeRedUrl = nodeRedUrl + targetUrl
         self.lastSentTime = 0
         self.sendInterval = sendInterval
 
+        # Gesture events bypass the throttle and go out in order from one thread
+        self.eventRetries = eventRetries
+        self.eventQueue = queue.Queue()
+        self.eventThread = None
+        self.eventLock = Lock()
+
     def sendData(self, data):
         if not data:
             print("No data to send")
@@ -43,19 +52,41 @@ class NodeRedClient:
 
             Thread(target=self._sendRequest, args=(payload,)).start()
 
+    def sendEvent(self, event):
+        """Queue a gesture event (see gestureEvents), never throttled or dropped"""
+        with self.eventLock:
+            if self.eventThread is None:
+                self.eventThread = Thread(target=self._sendEvents, daemon=True)
+                self.eventThread.start()
+        self.eventQueue.put(event)
+
+    def _sendEvents(self):
+        while True:
+            event = self.eventQueue.get()
+            payload = {
+                "timestamp": event["time"],
+                "data": event
+            }
+            for attempt in range(self.eventRetries + 1):
+                if self._sendRequest(payload):
+                    break
+                time.sleep(0.2 * (attempt + 1))
+
     def _sendRequest(self, payload):
         try:
-            response = requests.post(
-                self.nodeRedUrl,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=0.5
-            )
+            with metrics.timer("nodered_send"):
+                response = requests.post(
+                    self.nodeRedUrl,
+                    json=payload,
+                    headers={"Content-Type": "application/json"},
+                    timeout=0.5
+                )
 
             if response.status_code == 200:
                 print("Sent successfully")
-                pass
+                return True
             else:
                 print("Failed to send")
         except requests.exceptions.RequestException as e:
-            print(f"Error sending data: {e}")
\ No newline at end of file
+            print(f"Error sending data: {e}")
+        return False
\ No newline at end of file
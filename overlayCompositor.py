@@ -0,0 +1,69 @@
+import cv2
+import numpy as np
+
+
+class OverlayCompositor:
+    """Blends pre-rendered static UI layers onto frames.
+
+    Each UI state is drawn once per frame size by the `draw(canvas, state)`
+    callback and cached as BGR pixels plus a mask, cropped to the row bands
+    that contain drawing. Compositing a frame is then one masked copy per
+    band instead of re-rendering text and rectangles. The cache is cleared
+    when the frame size or the layout key changes.
+    """
+
+    def __init__(self, draw):
+        self.draw = draw
+        self.layers = {}
+        self.size = None
+        self.layout = None
+
+    def invalidate(self):
+        self.layers.clear()
+
+    def blend(self, frame, state, layout=None):
+        """Copy the cached layer for `state` onto the frame in place"""
+        size = frame.shape
+        if size != self.size or layout != self.layout:
+            self.invalidate()
+            self.size = size
+            self.layout = layout
+
+        layer = self.layers.get(state)
+        if layer is None:
+            layer = self.layers[state] = self._render(frame, state)
+
+        for (y0, y1, x0, x1), pixels, mask in layer:
+            # cv2.copyTo writes through the frame view in place
+            cv2.copyTo(pixels, mask, frame[y0:y1, x0:x1])
+        return frame
+
+    def _render(self, frame, state):
+        # Draw onto a black and a white canvas: a pixel belongs to the layer
+        # if the drawing changed it on either, whatever color was used
+        black = np.zeros_like(frame)
+        white = np.full_like(frame, 255)
+        self.draw(black, state)
+        self.draw(white, state)
+        mask = (black != 0) | (white != 255)
+        if mask.ndim == 3:
+            mask = mask.any(axis=2)
+        mask = mask.astype(np.uint8)
+
+        layer = []
+        for y0, y1 in self._row_bands(mask):
+            columns = np.flatnonzero(mask[y0:y1].any(axis=0))
+            x0, x1 = int(columns[0]), int(columns[-1]) + 1
+            layer.append((
+                (y0, y1, x0, x1),
+                black[y0:y1, x0:x1].copy(),
+                mask[y0:y1, x0:x1].copy()
+            ))
+        return layer
+
+    @staticmethod
+    def _row_bands(mask):
+        """(start, stop) of each run of rows that contain masked pixels"""
+        rows = mask.any(axis=1).astype(np.int8)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], rows, [0]))))
+        return [(int(start), int(stop)) for start, stop in edges.reshape(-1, 2)]
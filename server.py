@@ -1,15 +1,20 @@
-from flask import Flask, render_template, Response
-from flask_socketio import SocketIO
+from flask import Flask, render_template, Response, jsonify, request
+from flask_socketio import SocketIO, join_room, leave_room
 import threading
 import time
 import cv2
-import base64
 import os
 
-from handDetection import HandDetection
+from handDetection import HandDetection, PROFILES, create_hands_graph
+from detectionEngine import DetectionEngine
 from nodeRedClient import NodeRedClient
 from imageProcessing import ImageProcessing
-from camera import Camera
+from cameraPool import CameraPool
+from sessionPool import GraphPool, SessionPool
+from widgetRegistry import load_widgets
+from gestureEvents import GestureEventStream
+from metrics import metrics
+import config
 
 app = Flask(__name__)
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
@@ -20,71 +25,278 @@ handDataClient = NodeRedClient(
     targetUrl="/hand-detection"
 )
 
-# Initialize camera
-camera = Camera()
+# Optional multi-process inference, started before anything else touches
+# MediaPipe or opens cameras so the workers can be forked cleanly
+detection_engine = None
+if config.DETECTION_PROCESSES > 0:
+    detection_engine = DetectionEngine(num_workers=config.DETECTION_PROCESSES)
 
-# Initialize hand detector
-handDetector = HandDetection(nodeRedClient=handDataClient)
+# Touch widgets shared by every detector (each keeps its own touch state)
+widgets = load_widgets(config.WIDGETS_FILE)
+
+# One event stream for all detectors so sequence numbers are global; Node-RED
+# and web clients get hand/button events as they happen, not per frame. Each
+# event names its source, a camera or a client session
+gesture_events = GestureEventStream()
+gesture_events.subscribe(handDataClient.sendEvent)
+
+
+def emit_gesture_event(event):
+    # A client's own webcam events only go back to that client
+    if event.get("source") == "client":
+        socketio.emit('gesture_event', event, to=event["source_id"])
+    else:
+        socketio.emit('gesture_event', event)
+
+
+gesture_events.subscribe(emit_gesture_event)
+
+# Profile new detectors start with, follows runtime switches
+current_profile = config.DETECTION_PROFILE
+
+
+def create_hand_detector(**extra):
+    options = {
+        "tracking": config.HAND_TRACKING,
+        "max_tracking_interval": config.HAND_TRACKING_MAX_INTERVAL,
+        "inference_scale": config.INFERENCE_SCALE,
+        "latency_budget_ms": config.LATENCY_BUDGET_MS,
+        "roi": config.INFERENCE_ROI,
+        "roi_full_search_interval": config.ROI_FULL_SEARCH_INTERVAL,
+        "motion_gate": config.MOTION_GATE,
+        "landmark_renderer": config.LANDMARK_RENDERER,
+        "widgets": widgets,
+        "event_stream": gesture_events,
+        "profile": current_profile,
+        "mirror": config.MIRROR_MODE,
+        **extra
+    }
+    if detection_engine is not None:
+        return detection_engine.create_detector(nodeRedClient=handDataClient, **options)
+    return HandDetection(nodeRedClient=handDataClient, **options)
+
+
+def create_graph(profile):
+    """MediaPipe graph for detectors sharing a GraphPool"""
+    if detection_engine is not None:
+        return detection_engine.create_graph(profile)
+    return create_hands_graph(profile)
+
+
+# Initialize cameras (or file/synthetic sources, see config.py), each with its
+# own hand detector, optionally sharing fewer MediaPipe graphs
+camera_pool = CameraPool(
+    config.FRAME_SOURCES,
+    detector_factory=lambda camera_id, hands_pool: create_hand_detector(
+        hands_pool=hands_pool, event_source=("camera", camera_id)),
+    num_detectors=config.DETECTOR_WORKERS,
+    graph_factory=create_graph,
+    pacing=config.FRAME_SOURCE_PACING,
+    raw_mjpeg=config.CAMERA_RAW_MJPEG
+)
+
+# Optionally record the live cameras for repeatable replay
+if config.CAMERA_RECORD_PATH:
+    for record_camera_id, record_camera in camera_pool.cameras.items():
+        if hasattr(record_camera, "start_recording"):
+            record_camera.start_recording(config.CAMERA_RECORD_PATH.format(camera=record_camera_id))
+
+# First camera, used to decide whether clients fall back to their own webcam
+camera = camera_pool.camera(0)
+
+# Frames uploaded by clients: every Socket.IO session keeps its own detector
+# state, the MediaPipe graphs they run on come from a small shared pool
+session_graphs = GraphPool(create_graph, size=config.SESSION_DETECTORS)
+session_detectors = SessionPool(
+    lambda sid: create_hand_detector(hands_pool=session_graphs, event_source=("client", sid)),
+    max_sessions=config.SESSION_MAX,
+    idle_timeout=config.SESSION_IDLE_TIMEOUT,
+    min_idle=config.SESSION_MIN_IDLE
+)
 
 # Init image processing
-imageProcessing = ImageProcessing(handDetector)
+imageProcessing = ImageProcessing(session_detectors)
+
+# Running stream thread per camera, as (thread, stop event). A camera
+# streams while at least one viewer watches it
+stream_threads = {}
+
+# Viewers (sids) per camera, and those of them that want the unprocessed
+# camera JPEG without overlays
+viewers = {}
+raw_viewers = {}
+# Socket.IO handlers run on their own threads, viewer bookkeeping is shared
+viewers_lock = threading.RLock()
+
+# Room each viewer (sid) currently watches, as (camera_id, raw)
+viewer_rooms = {}
+
+
+def camera_room(camera_id, raw=False):
+    return f"camera-{camera_id}-raw" if raw else f"camera-{camera_id}"
 
-# Global flag to control camera streaming
-streaming = False
-stream_thread = None
+
+def leave_camera_room(sid, room=True):
+    """Stop sending a viewer the camera it watched, leaving its Socket.IO room if still connected"""
+    with viewers_lock:
+        watching = viewer_rooms.pop(sid, None)
+        if watching is None:
+            return
+        camera_id, raw = watching
+        if room:
+            leave_room(camera_room(camera_id, raw), sid=sid)
+        if raw:
+            raw_viewers.get(camera_id, set()).discard(sid)
+        viewers.get(camera_id, set()).discard(sid)
+        if not viewers.get(camera_id):
+            stop_camera_stream(camera_id)
+
+
+def start_camera_stream(camera_id):
+    if camera_id in stream_threads:
+        return
+    stop = threading.Event()
+    thread = threading.Thread(target=camera_stream, args=(camera_id, stop))
+    thread.daemon = True
+    thread.start()
+    stream_threads[camera_id] = (thread, stop)
+
+
+def stop_camera_stream(camera_id):
+    """Stop a camera's stream thread once its last viewer is gone"""
+    running = stream_threads.pop(camera_id, None)
+    if running is not None:
+        running[1].set()
+        print(f"Camera {camera_id} streaming stopped")
 
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/cameras')
+def cameras():
+    """Per-camera fps and drop counters"""
+    return jsonify(camera_pool.stats_snapshot())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Stage timings, fps and drop counters in Prometheus text format"""
+    return Response(metrics.prometheus(camera_pool.stats_snapshot()), mimetype='text/plain; version=0.0.4')
+
+def stats_snapshot():
+    return {"cameras": camera_pool.stats_snapshot(), "sessions": session_detectors.stats(),
+            "session_graphs": session_graphs.stats(), "stages": metrics.snapshot()}
+
+def push_stats():
+    """Background task sending the stats event to every client"""
+    while True:
+        socketio.sleep(config.STATS_INTERVAL)
+        socketio.emit('stats', stats_snapshot())
+
+@socketio.on('get_stats')
+def handle_get_stats(data=None):
+    return stats_snapshot()
+
+def all_detectors():
+    return list(camera_pool.detectors.values()) + session_detectors.detectors()
+
+
+def switch_profile(profile):
+    """Switch every detector to a profile, each applies it before its next frame"""
+    global current_profile
+    if profile not in PROFILES:
+        return {"status": "error", "message": f"Unknown profile {profile}", "profiles": list(PROFILES)}
+    current_profile = profile
+    # Detectors sharing graph pools build nothing themselves, the pools
+    # build and warm up the new graphs here instead of on the next frames
+    for graphs in (camera_pool.graphs, session_graphs):
+        if graphs is not None:
+            graphs.prepare(profile)
+    for detector in all_detectors():
+        detector.set_profile(profile)
+    print(f"🎛️  Switching detection profile to {profile}")
+    return {"status": "ok", "profile": profile}
+
+@app.route('/profile', methods=['GET', 'POST'])
+def profile():
+    """Current detection profile, or switch it with {"profile": name}"""
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or request.form
+        result = switch_profile(data.get("profile"))
+        return jsonify(result), (200 if result["status"] == "ok" else 400)
+    return jsonify({"profile": current_profile, "profiles": list(PROFILES)})
+
+@socketio.on('set_profile')
+def handle_set_profile(data=None):
+    return switch_profile((data or {}).get("profile"))
+
 @socketio.on('start_stream')
-def handle_start_stream():
-    global streaming, stream_thread
-    
-    if not streaming:
-        streaming = True
-        stream_thread = threading.Thread(target=camera_stream)
-        stream_thread.daemon = True
-        stream_thread.start()
-        print("Started camera stream thread")
+def handle_start_stream(data=None):
+    # Each viewer joins the room of the camera it wants to watch
+    data = data or {}
+    camera_id = int(data.get("camera", 0))
+    if camera_pool.camera(camera_id) is None:
+        return {"status": "error", "message": f"Unknown camera {camera_id}"}
+    raw = bool(data.get("raw", False))
+    # A viewer watches one camera at a time, switching leaves the previous room
+    with viewers_lock:
+        leave_camera_room(request.sid)
+        join_room(camera_room(camera_id, raw))
+        viewer_rooms[request.sid] = (camera_id, raw)
+        viewers.setdefault(camera_id, set()).add(request.sid)
+        if raw:
+            raw_viewers.setdefault(camera_id, set()).add(request.sid)
+        start_camera_stream(camera_id)
     
-    return {"status": "started"}
+    return {"status": "started", "camera": camera_id}
 
-def camera_stream():
-    global streaming
-    
-    print("Camera stream thread running")
+def camera_stream(camera_id, stop):
+    print(f"Camera {camera_id} stream thread running")
+    metrics.set_camera(camera_id)
+    camera = camera_pool.camera(camera_id)
+    stats = camera_pool.stats[camera_id]
     frame_count = 0
+    last_seq = 0
     
-    while streaming:
+    while not stop.is_set():
         if camera is not None and camera.is_opened():
             try:
-                frame = camera.get_frame()
+                # Block until the camera publishes a frame we haven't processed yet
+                with metrics.timer("capture_wait"):
+                    lease = camera.wait_for_frame(last_seq, timeout=1.0)
                 
-                if frame is None:
-                    time.sleep(0.01)  # Short sleep if no frame
+                if lease is None:
                     continue
+                skipped = lease.seq - last_seq - 1 if last_seq else 0
+                last_seq = lease.seq
                 
-                # Process the frame with hand detection
-                processed_frame, detection_data = handDetector.process_frame(frame)
-                
-                # Use lower quality JPEG for faster encoding
-                ret, buffer = cv2.imencode('.jpg', processed_frame, [cv2.IMWRITE_JPEG_QUALITY, 50])
+                # Process the borrowed frame in place, the slot is pinned until
+                # released; the detector's output buffer is reused for its next
+                # frame, so it is encoded before the detector is let go
+                with camera_pool.detector(camera_id) as detector, lease:
+                    processed_frame, detection_data = detector.process_lease(lease)
+                    if raw_viewers.get(camera_id):
+                        forward_raw_frame(camera_id, lease, detection_data)
+                    
+                    # Use lower quality JPEG for faster encoding
+                    with metrics.timer("imencode"):
+                        ret, buffer = cv2.imencode('.jpg', processed_frame, [cv2.IMWRITE_JPEG_QUALITY, 50])
+                stats.record(skipped)
                 
                 if ret:
-                    # Convert to base64 for sending via socketio
-                    image_base64 = base64.b64encode(buffer).decode('utf-8')
-                        
                     # Log frame transmission every 30 frames
                     frame_count += 1
                     if frame_count % 30 == 0:
-                        print(f"Successfully transmitted frame #{frame_count} to web client")
+                        print(f"Camera {camera_id}: transmitted frame #{frame_count} to web clients ({stats.snapshot()})")
                         
-                    socketio.emit('server_frame', {
-                        "image": f'data:image/jpeg;base64,{image_base64}',
-                        "detection_data": detection_data
-                    })
+                    # The JPEG goes out as a binary attachment, detection_data as JSON
+                    with metrics.timer("emit"):
+                        socketio.emit('server_frame', {
+                            "camera": camera_id,
+                            "image": buffer.tobytes(),
+                            "detection_data": detection_data
+                        }, to=camera_room(camera_id))
                 else:
                     print("Error: Failed to encode frame to JPEG")
                         
@@ -93,27 +305,41 @@ def camera_stream():
                 import traceback
                 traceback.print_exc()
         else:
-            print("Warning: Camera is None or not opened in stream thread")
+            print(f"Warning: Camera {camera_id} is None or not opened in stream thread")
             if camera is not None:
                 camera.openCamera()
             time.sleep(1)
-            
-        # Faster frame rate for real-time feel
-        time.sleep(1/30)  # Target 30 FPS           
+
+def forward_raw_frame(camera_id, lease, detection_data):
+    """Send the camera image without overlays, re-using the MJPEG bytes when available"""
+    if lease.jpeg is not None:
+        buffer = lease.jpeg
+    else:
+        ret, buffer = cv2.imencode('.jpg', lease.frame, [cv2.IMWRITE_JPEG_QUALITY, 50])
+        if not ret:
+            return
+    socketio.emit('server_frame', {
+        "camera": camera_id,
+        "raw": True,
+        "image": buffer.tobytes(),
+        "detection_data": detection_data
+    }, to=camera_room(camera_id, raw=True))
 
 @socketio.on('stop_stream')
 def handle_stop_stream():
-    global streaming
-    streaming = False
-    print("Camera streaming stopped")
+    leave_camera_room(request.sid)
     return {"status": "stopped"}
 
 @socketio.on('frame')
 def handle_client_frame(data):  
-    """Handle frames sent from the client's webcam (fallback when server camera isn't available)"""
+    """Handle frames sent from the client's webcam (fallback when server camera isn't available).
+
+    data is the JPEG as a binary attachment, or a base64 data: URL.
+    """
     try:
-        if not streaming or camera is None:
-            imageProcessing.handleFrame(data, socketio)
+        if not stream_threads or camera is None:
+            metrics.set_camera("client")
+            imageProcessing.handleFrame(data, socketio, request.sid)
     except Exception as e:
         print(f"Error processing client frame: {e}")
 
@@ -126,18 +352,23 @@ def handle_connect():
     
 @socketio.on('disconnect')
 def handle_disconnect():
-    global streaming
-    if streaming:
-        streaming = False
-        print("Streaming stopped due to client disconnect")
+    session_detectors.remove(request.sid)
+    # Socket.IO drops the rooms itself, only our bookkeeping is left; the
+    # camera stops streaming if this was its last viewer
+    leave_camera_room(request.sid, room=False)
     
 if __name__ == '__main__':
     try:
+        if config.STATS_INTERVAL > 0:
+            socketio.start_background_task(push_stats)
         print("Starting server at http://0.0.0.0:5050")
         # Disable debug mode to prevent camera access issues on restart
         socketio.run(app, host='0.0.0.0', port=5050, debug=False, allow_unsafe_werkzeug=True)
     finally:
-        streaming = False
-        if camera is not None:
-            camera.release()
-        handDetector.close()
+        for stream_camera_id in list(stream_threads):
+            stop_camera_stream(stream_camera_id)
+        camera_pool.release()
+        session_detectors.close()
+        session_graphs.close()
+        if detection_engine is not None:
+            detection_engine.close()
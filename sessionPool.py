@@ -0,0 +1,276 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class GraphPool:
+    """Bounded set of inference graphs that session detectors borrow per frame.
+
+    Graphs are created on demand for a detection profile, up to `size` of
+    them. A detector gets back the graph it used last whenever that one is
+    free; a graph handed to another detector is reset first, so MediaPipe
+    never tracks hands across two clients' frames. The factory is called
+    with a profile name and returns a ready, warmed-up graph with reset()
+    and close() (a mediapipe Hands, or a detectionEngine.EngineGraph).
+    Call prepare() on a profile switch so frames don't wait for new graphs.
+    """
+
+    def __init__(self, factory, size=4, timeout=5.0):
+        self.factory = factory
+        self.size = max(1, size)
+        self.timeout = timeout
+        # {"graph", "profile", "owner"} per graph, plus "next" (graph, profile)
+        # waiting to replace a busy one; free ones least recently released first
+        self.entries = []
+        self.free = []
+        self.cond = threading.Condition()
+        # Profile of the last prepare(), which replaces the previous one
+        self.profile = None
+        self.created = 0
+        self.resets = 0
+
+    def acquire(self, owner, profile):
+        """Check out a graph for `owner`, blocking while all of them are in use"""
+        closing = None
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.free or len(self.entries) < self.size, timeout=self.timeout):
+                raise RuntimeError("No hand detection graph became free")
+            entry = next((e for e in self.free if e["owner"] is owner and e["profile"] == profile), None)
+            if entry is None:
+                entry = next((e for e in self.free if e["profile"] == profile), None)
+            if entry is None and self.profile not in (None, profile):
+                # A frame of a detector that hasn't applied the prepared
+                # profile yet runs on the new graphs rather than rebuilding
+                entry = next((e for e in self.free if e["profile"] == self.profile), None)
+                if entry is not None:
+                    profile = self.profile
+            if entry is None and len(self.entries) < self.size:
+                entry = {"graph": None, "profile": profile, "owner": None}
+                self.entries.append(entry)
+            elif entry is None:
+                # Every graph is built for another profile, rebuild the least recently used one
+                entry = self.free[0]
+                closing, entry["graph"], entry["profile"] = entry["graph"], None, profile
+            if entry in self.free:
+                self.free.remove(entry)
+            previous_owner, entry["owner"] = entry["owner"], owner
+
+        if closing is not None:
+            closing.close()
+        try:
+            if entry["graph"] is None:
+                entry["graph"] = self.factory(profile)
+                self.created += 1
+            elif previous_owner is not None and previous_owner is not owner:
+                entry["graph"].reset()
+                self.resets += 1
+        except Exception:
+            with self.cond:
+                self.entries.remove(entry)
+                self.cond.notify()
+            raise
+        return entry
+
+    def release(self, entry):
+        closing = None
+        with self.cond:
+            if "next" in entry:
+                # prepare() built a replacement while this graph was busy
+                closing = entry["graph"]
+                (entry["graph"], entry["profile"]), entry["owner"] = entry.pop("next"), None
+            self.free.append(entry)
+            self.cond.notify()
+        if closing is not None:
+            closing.close()
+
+    def prepare(self, profile):
+        """Rebuild every graph for `profile` ahead of a profile switch.
+
+        The new graphs are built on the caller's thread while frames keep
+        using the current ones, then swapped in; a graph in use is swapped
+        when it is released.
+        """
+        with self.cond:
+            count = sum(entry["profile"] != profile for entry in self.entries)
+        graphs = [self.factory(profile) for _ in range(count)]
+        closing = []
+        with self.cond:
+            self.profile = profile
+            self.created += count
+            for entry in self.entries:
+                # A replacement for an earlier switch is outdated now
+                pending = entry.pop("next", None)
+                if pending is not None:
+                    closing.append(pending[0])
+                if entry["profile"] == profile or not graphs:
+                    continue
+                graph = graphs.pop()
+                if entry in self.free:
+                    closing.append(entry["graph"])
+                    entry.update(graph=graph, profile=profile, owner=None)
+                else:
+                    entry["next"] = (graph, profile)
+            closing.extend(graphs)
+        for graph in closing:
+            if graph is not None:
+                graph.close()
+
+    @contextmanager
+    def graph(self, owner, profile):
+        entry = self.acquire(owner, profile)
+        try:
+            yield entry["graph"]
+        finally:
+            self.release(entry)
+
+    def stats(self):
+        with self.cond:
+            return {"graphs": len(self.entries), "max_graphs": self.size, "busy": len(self.entries) - len(self.free),
+                    "created": self.created, "resets": self.resets}
+
+    def close(self):
+        with self.cond:
+            graphs = [entry["graph"] for entry in self.entries if entry["graph"] is not None]
+            graphs += [entry["next"][0] for entry in self.entries if "next" in entry]
+            self.entries.clear()
+            self.free.clear()
+        for graph in graphs:
+            graph.close()
+
+
+class SessionPool:
+    """Per-session detector state for clients that upload their own frames.
+
+    Every Socket.IO session gets its own detector, built by factory(sid)
+    and holding its button, touch and hand state; the MediaPipe graphs come
+    from a GraphPool, so sessions are cheap and keep their state however
+    many graphs there are.
+    At most max_sessions exist: a new session replaces the least recently
+    used one only if that has been idle for min_idle seconds, otherwise its
+    frame is dropped. Sessions idle for idle_timeout seconds are closed on
+    the next acquire.
+    """
+
+    def __init__(self, factory, max_sessions=32, idle_timeout=60.0, min_idle=5.0, clock=time.monotonic):
+        self.factory = factory
+        self.max_sessions = max(1, max_sessions)
+        self.idle_timeout = idle_timeout
+        self.min_idle = min_idle
+        self.clock = clock
+        # sid -> {"detector", "busy", "last_used"}, least recently used first
+        self.sessions = OrderedDict()
+        self.lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+        self.rejected = 0
+
+    def acquire(self, sid):
+        """Check out the session's detector, or None to drop this frame.
+
+        None means the session is still busy with its previous frame, or
+        the pool is full and no other session has been idle long enough.
+        """
+        now = self.clock()
+        with self.lock:
+            closing = self._expire(now)
+            session = self.sessions.get(sid)
+            if session is not None:
+                if session["busy"]:
+                    self.rejected += 1
+                    session = None
+                else:
+                    session["busy"] = True
+                    session["last_used"] = now
+                    self.sessions.move_to_end(sid)
+            else:
+                if len(self.sessions) >= self.max_sessions:
+                    victim = next(iter(self.sessions))
+                    if self.sessions[victim]["busy"] or now - self.sessions[victim]["last_used"] < self.min_idle:
+                        self.rejected += 1
+                    else:
+                        closing.append(self.sessions.pop(victim)["detector"])
+                        self.evicted += 1
+                if len(self.sessions) < self.max_sessions:
+                    # Reserve the slot, the detector is built outside the lock
+                    self.sessions[sid] = {"detector": None, "busy": True, "last_used": now}
+                    session = {"detector": None}
+        self._close(closing)
+
+        if session is None:
+            return None
+        if session["detector"] is not None:
+            return session["detector"]
+        try:
+            detector = self.factory(sid)
+        except Exception:
+            with self.lock:
+                self.sessions.pop(sid, None)
+            raise
+        with self.lock:
+            self.sessions[sid]["detector"] = detector
+            self.created += 1
+        print(f"👤 Detector created for session {sid} ({len(self.sessions)}/{self.max_sessions})")
+        return detector
+
+    def release(self, sid):
+        with self.lock:
+            session = self.sessions.get(sid)
+            if session is not None:
+                session["busy"] = False
+                session["last_used"] = self.clock()
+
+    @contextmanager
+    def session(self, sid):
+        detector = self.acquire(sid)
+        try:
+            yield detector
+        finally:
+            if detector is not None:
+                self.release(sid)
+
+    def remove(self, sid):
+        """Close a session's detector, e.g. when its client disconnects"""
+        with self.lock:
+            session = self.sessions.get(sid)
+            # A busy session is still processing, it is expired later instead
+            if session is None or session["busy"]:
+                return
+            del self.sessions[sid]
+        self._close([session["detector"]])
+
+    def _expire(self, now):
+        """Drop idle sessions older than idle_timeout; returns their detectors to close"""
+        expired = [
+            sid for sid, session in self.sessions.items()
+            if not session["busy"] and now - session["last_used"] > self.idle_timeout
+        ]
+        self.evicted += len(expired)
+        return [self.sessions.pop(sid)["detector"] for sid in expired]
+
+    @staticmethod
+    def _close(detectors):
+        for detector in detectors:
+            if detector is not None:
+                detector.close()
+
+    def detectors(self):
+        with self.lock:
+            return [session["detector"] for session in self.sessions.values() if session["detector"] is not None]
+
+    def stats(self):
+        with self.lock:
+            return {
+                "sessions": len(self.sessions),
+                "max_sessions": self.max_sessions,
+                "busy": sum(session["busy"] for session in self.sessions.values()),
+                "created": self.created,
+                "evicted": self.evicted,
+                "rejected": self.rejected,
+            }
+
+    def close(self):
+        with self.lock:
+            detectors = [session["detector"] for session in self.sessions.values()]
+            self.sessions.clear()
+        self._close(detectors)
@@ -0,0 +1,122 @@
+"""Unit tests for frameBuffer.py: python -m pytest test_frameBuffer.py"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from frameBuffer import FrameRingBuffer
+
+
+def write(ring, value, timestamp=0.0):
+    index, slot = ring.acquire_write_slot()
+    slot[:] = value
+    return ring.commit(index, timestamp)
+
+
+def test_needs_two_slots():
+    with pytest.raises(ValueError):
+        FrameRingBuffer(num_slots=1)
+
+
+def test_borrow_latest_frame():
+    ring = FrameRingBuffer(num_slots=3, shape=(2, 2))
+    assert ring.borrow() is None
+    assert write(ring, 1, timestamp=1.0) == 1
+    assert write(ring, 2, timestamp=2.0) == 2
+
+    with ring.borrow() as lease:
+        assert lease.seq == 2
+        assert lease.timestamp == 2.0
+        assert (lease.frame == 2).all()
+        assert not lease.frame.flags.writeable
+
+
+def test_pinned_and_reserved_slots_are_never_written():
+    ring = FrameRingBuffer(num_slots=3, shape=(2, 2))
+    write(ring, 1)
+    lease = ring.borrow()
+    write(ring, 2)
+    reserved, _ = ring.acquire_write_slot()
+
+    # One slot is pinned, one the latest frame and one reserved
+    assert reserved != lease._slot
+    assert ring.acquire_write_slot() == (None, None)
+    assert (lease.frame == 1).all()
+    assert ring.dropped == 1
+
+    ring.abort(reserved)
+    index, _ = ring.acquire_write_slot()
+    assert index == reserved
+    ring.abort(index)
+
+    lease.release()
+    lease.release()
+    assert ring.pins == [0, 0, 0]
+
+
+def test_writers_get_different_slots():
+    ring = FrameRingBuffer(num_slots=4, shape=(2, 2))
+    first, _ = ring.acquire_write_slot()
+    second, _ = ring.acquire_write_slot()
+    assert first != second
+    assert ring.commit(second, 0.0) == 1
+    assert ring.commit(first, 0.0) == 2
+    # A slot is committed once
+    assert ring.commit(first, 0.0) is None
+
+
+def test_reset_keeps_slots_reserved_by_a_running_writer():
+    ring = FrameRingBuffer(num_slots=2, shape=(2, 2))
+    write(ring, 1)
+    stale, _ = ring.acquire_write_slot()
+    ring.reset()
+
+    assert ring.borrow() is None
+    index, _ = ring.acquire_write_slot()
+    assert index != stale
+    ring.abort(stale)
+    ring.commit(index, 0.0)
+
+
+def test_seq_keeps_increasing_across_reset():
+    ring = FrameRingBuffer(num_slots=2, shape=(2, 2))
+    write(ring, 1)
+    last_seq = write(ring, 2)
+    ring.reset()
+    assert ring.wait_for(last_seq, timeout=0) is None
+
+    write(ring, 3)
+    with ring.wait_for(last_seq, timeout=0) as lease:
+        assert lease.seq == last_seq + 1
+        assert (lease.frame == 3).all()
+
+
+def test_wait_for_blocks_until_a_newer_frame():
+    ring = FrameRingBuffer(num_slots=2, shape=(2, 2))
+    seq = write(ring, 1)
+    assert ring.wait_for(seq, timeout=0.01) is None
+
+    writer = threading.Timer(0.05, write, args=(ring, 2))
+    writer.start()
+    with ring.wait_for(seq, timeout=1.0) as lease:
+        assert lease.seq == seq + 1
+    writer.join()
+
+
+def test_commit_adopts_a_new_frame_shape():
+    ring = FrameRingBuffer(num_slots=2, shape=(2, 2))
+    index, _ = ring.acquire_write_slot()
+    ring.commit(index, 0.0, np.ones((3, 3), dtype=np.uint8))
+    assert ring.shape == (3, 3)
+    with ring.borrow() as lease:
+        assert lease.frame.shape == (3, 3)
+
+
+def test_jpeg_slots_expose_their_bytes():
+    ring = FrameRingBuffer(num_slots=2, shape=(16,))
+    index, slot = ring.acquire_write_slot()
+    slot[:4] = [1, 2, 3, 4]
+    ring.commit(index, 0.0, nbytes=4)
+    with ring.borrow() as lease:
+        assert lease.jpeg.tolist() == [1, 2, 3, 4]
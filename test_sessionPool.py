@@ -0,0 +1,202 @@
+"""Unit tests for sessionPool.py: python -m pytest test_sessionPool.py"""
+
+import pytest
+
+from sessionPool import GraphPool, SessionPool
+
+
+class FakeGraph:
+    def __init__(self, profile):
+        self.profile = profile
+        self.resets = 0
+        self.closed = False
+
+    def reset(self):
+        self.resets += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDetector:
+    def __init__(self, sid=None, graphs=None):
+        self.sid = sid
+        self.graphs = graphs
+        self.closed = False
+
+    def process(self, profile="balanced"):
+        with self.graphs.graph(self, profile) as graph:
+            return graph
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_clients_keep_their_detectors_with_fewer_graphs():
+    graphs = GraphPool(FakeGraph, size=4)
+    created = []
+
+    def factory(sid):
+        created.append(FakeDetector(sid, graphs))
+        return created[-1]
+
+    sessions = SessionPool(factory, max_sessions=32)
+    for _ in range(10):
+        for sid in range(5):
+            with sessions.session(sid) as detector:
+                detector.process()
+
+    assert len(created) == 5
+    assert sessions.stats()["evicted"] == 0
+    assert sessions.stats()["rejected"] == 0
+    assert graphs.stats()["graphs"] == 1
+
+
+def test_graph_is_reset_when_it_changes_owner():
+    graphs = GraphPool(FakeGraph, size=2)
+    first, second, third = FakeDetector(graphs=graphs), FakeDetector(graphs=graphs), FakeDetector(graphs=graphs)
+
+    entries = [graphs.acquire(first, "balanced"), graphs.acquire(second, "balanced")]
+    assert graphs.stats()["created"] == 2
+    for entry in entries:
+        graphs.release(entry)
+
+    # Each detector gets its own graph back untouched
+    assert first.process() is entries[0]["graph"]
+    assert entries[0]["graph"].resets == 0
+
+    # A third detector takes the least recently released graph, reset first
+    graph = third.process()
+    assert graph is entries[1]["graph"]
+    assert graph.resets == 1
+    assert graphs.stats()["graphs"] == 2
+
+
+def test_all_graphs_busy_times_out():
+    graphs = GraphPool(FakeGraph, size=1, timeout=0.01)
+    graphs.acquire(FakeDetector(), "balanced")
+    with pytest.raises(RuntimeError):
+        graphs.acquire(FakeDetector(), "balanced")
+
+
+def test_graph_rebuilt_for_another_profile():
+    graphs = GraphPool(FakeGraph, size=1)
+    detector = FakeDetector(graphs=graphs)
+    fast = detector.process("fast")
+    accurate = detector.process("accurate")
+
+    assert fast.closed
+    assert accurate.profile == "accurate"
+    assert graphs.stats() == {"graphs": 1, "max_graphs": 1, "busy": 0, "created": 2, "resets": 0}
+
+
+def test_prepare_builds_graphs_for_a_profile_switch():
+    graphs = GraphPool(FakeGraph, size=2)
+    first, second = FakeDetector(graphs=graphs), FakeDetector(graphs=graphs)
+    entries = [graphs.acquire(first, "balanced"), graphs.acquire(second, "balanced")]
+    old = [entry["graph"] for entry in entries]
+    graphs.release(entries[0])
+
+    graphs.prepare("lite")
+    assert old[0].closed
+    # The busy graph is swapped once its frame is done
+    assert not old[1].closed
+    graphs.release(entries[1])
+    assert old[1].closed
+
+    created = graphs.stats()["created"]
+    assert first.process("lite").profile == "lite"
+    assert second.process("lite").profile == "lite"
+    assert graphs.stats()["created"] == created
+    assert graphs.stats()["resets"] == 0
+
+
+def test_frames_still_on_the_old_profile_use_prepared_graphs():
+    graphs = GraphPool(FakeGraph, size=1)
+    detector = FakeDetector(graphs=graphs)
+    detector.process("balanced")
+    graphs.prepare("lite")
+
+    assert detector.process("balanced").profile == "lite"
+    assert graphs.stats()["created"] == 2
+
+
+def test_prepare_again_drops_the_pending_swap():
+    graphs = GraphPool(FakeGraph, size=1)
+    entry = graphs.acquire(FakeDetector(), "balanced")
+    graphs.prepare("lite")
+    pending = entry["next"][0]
+    graphs.prepare("balanced")
+
+    assert pending.closed
+    graphs.release(entry)
+    assert entry["profile"] == "balanced"
+    assert not entry["graph"].closed
+
+
+def test_busy_session_drops_the_next_frame():
+    sessions = SessionPool(FakeDetector, max_sessions=2)
+    detector = sessions.acquire("a")
+    assert sessions.acquire("a") is None
+    sessions.release("a")
+    assert sessions.acquire("a") is detector
+    assert detector.sid == "a"
+    assert sessions.stats()["rejected"] == 1
+
+
+def test_full_pool_evicts_only_after_min_idle():
+    clock = FakeClock()
+    sessions = SessionPool(FakeDetector, max_sessions=2, idle_timeout=60, min_idle=5, clock=clock)
+    first = sessions.acquire("a")
+    sessions.release("a")
+    sessions.acquire("b")
+    sessions.release("b")
+
+    # "a" streamed a moment ago, so "c" is turned away instead
+    clock.now = 1
+    assert sessions.acquire("c") is None
+    assert not first.closed
+    assert sessions.stats()["rejected"] == 1
+
+    clock.now = 6
+    assert sessions.acquire("c") is not None
+    assert first.closed
+    assert sessions.stats()["evicted"] == 1
+    assert sessions.stats()["sessions"] == 2
+
+
+def test_idle_sessions_expire():
+    clock = FakeClock()
+    sessions = SessionPool(FakeDetector, max_sessions=4, idle_timeout=60, clock=clock)
+    with sessions.session("a") as detector:
+        pass
+
+    clock.now = 61
+    with sessions.session("b"):
+        pass
+    assert detector.closed
+    assert [d for d in sessions.detectors() if d is detector] == []
+
+
+def test_remove_and_close():
+    sessions = SessionPool(FakeDetector)
+    with sessions.session("a") as first:
+        # A busy session is left for expiry
+        sessions.remove("a")
+        assert not first.closed
+    sessions.remove("a")
+    assert first.closed
+
+    with sessions.session("b") as second:
+        pass
+    sessions.close()
+    assert second.closed
+    assert sessions.stats()["sessions"] == 0
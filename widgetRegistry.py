@@ -0,0 +1,213 @@
+import json
+
+import cv2
+import numpy as np
+
+
+# The two buttons the UI has always shown, used when no widget file is configured
+DEFAULT_WIDGETS = [
+    {"name": "green", "shape": "rect", "pos": [490, 50], "size": [100, 50], "color": [0, 255, 0]},
+    {"name": "red", "shape": "rect", "pos": [50, 50], "size": [100, 50], "color": [0, 0, 255]},
+]
+
+RECT = 0
+CIRCLE = 1
+
+
+class Widget:
+    """One touch target: a rectangle (pos, size) or a circle (center, radius).
+
+    `payload` is merged into the Node-RED message sent when it is pressed,
+    `dwell` is how long (seconds) a fingertip has to stay inside before the
+    press fires.
+    """
+
+    def __init__(self, name, shape="rect", pos=None, size=None, center=None, radius=None,
+                 color=(255, 255, 255), payload=None, dwell=0.0):
+        self.name = name
+        self.shape = shape
+        self.color = tuple(int(c) for c in color)
+        self.payload = payload or {}
+        self.dwell = float(dwell)
+        if shape == "rect":
+            self.pos = tuple(int(v) for v in pos)
+            self.size = tuple(int(v) for v in size)
+            x, y = self.pos
+            self.bbox = (x, y, x + self.size[0], y + self.size[1])
+        elif shape == "circle":
+            self.center = tuple(int(v) for v in center)
+            self.radius = int(radius)
+            cx, cy = self.center
+            self.bbox = (cx - self.radius, cy - self.radius, cx + self.radius, cy + self.radius)
+        else:
+            raise ValueError(f"Unknown widget shape '{shape}' for widget '{name}'")
+
+    @classmethod
+    def from_config(cls, entry):
+        return cls(**entry)
+
+    def draw(self, frame, color=None):
+        color = color or self.color
+        if self.shape == "rect":
+            cv2.rectangle(frame, self.pos, (self.bbox[2], self.bbox[3]), color, cv2.FILLED)
+        else:
+            cv2.circle(frame, self.center, self.radius, color, cv2.FILLED)
+
+    def layout_key(self):
+        return (self.shape, self.bbox, self.color)
+
+
+def load_widgets(path=None):
+    """Widgets from a JSON file holding a list of widget entries, or the defaults"""
+    if not path:
+        return [Widget.from_config(entry) for entry in DEFAULT_WIDGETS]
+    with open(path) as f:
+        entries = json.load(f)
+    widgets = [Widget.from_config(entry) for entry in entries]
+    print(f"🔘 Loaded {len(widgets)} widgets from {path}")
+    return widgets
+
+
+class WidgetRegistry:
+    """Hit-tests fingertips against many widgets through a uniform grid.
+
+    Every widget is registered in the grid cells its bounding box covers,
+    so a fingertip is only tested exactly against the few widgets sharing
+    its cell. All fingertips of a frame are looked up and tested in one
+    vectorized pass.
+    """
+
+    def __init__(self, widgets, cell_size=64):
+        self.widgets = list(widgets)
+        self.cell_size = cell_size
+        self.names = [widget.name for widget in self.widgets]
+        self.by_name = {widget.name: widget for widget in self.widgets}
+        if len(self.by_name) != len(self.widgets):
+            raise ValueError("Widget names must be unique")
+
+        # Per-widget geometry as arrays for the exact test
+        self.shapes = np.array([RECT if w.shape == "rect" else CIRCLE for w in self.widgets], dtype=np.int8)
+        self.bboxes = np.array([w.bbox for w in self.widgets], dtype=np.int32).reshape(-1, 4)
+        self.centers = np.array([getattr(w, "center", (0, 0)) for w in self.widgets], dtype=np.int64).reshape(-1, 2)
+        self.radii_sq = np.array([getattr(w, "radius", 0) ** 2 for w in self.widgets], dtype=np.int64)
+        self._build_grid()
+
+    def _build_grid(self):
+        """CSR-style grid: widgets of cell i are cell_items[cell_start[i]:cell_start[i + 1]]"""
+        if len(self.widgets):
+            # Negative coordinates fall into cell 0, anything past the last
+            # widget can't hit
+            x1, y1 = self.bboxes[:, 2].max(), self.bboxes[:, 3].max()
+        else:
+            x1 = y1 = 0
+        self.cols = max(0, int(x1)) // self.cell_size + 1
+        self.rows = max(0, int(y1)) // self.cell_size + 1
+
+        cells = [[] for _ in range(self.cols * self.rows)]
+        for idx, (bx0, by0, bx1, by1) in enumerate(self.bboxes.tolist()):
+            c0, c1 = max(0, bx0) // self.cell_size, max(0, bx1) // self.cell_size
+            r0, r1 = max(0, by0) // self.cell_size, max(0, by1) // self.cell_size
+            for row in range(r0, r1 + 1):
+                for col in range(c0, c1 + 1):
+                    cells[row * self.cols + col].append(idx)
+
+        counts = np.array([len(cell) for cell in cells], dtype=np.intp)
+        self.cell_start = np.concatenate(([0], np.cumsum(counts)))
+        self.cell_items = np.array([idx for cell in cells for idx in cell], dtype=np.intp)
+
+    def get(self, name):
+        return self.by_name[name]
+
+    def layout_key(self):
+        """Changes whenever any widget moves, resizes or changes color"""
+        return tuple(widget.layout_key() for widget in self.widgets)
+
+    def hit_test(self, points):
+        """(point_idx, widget_idx) arrays of every fingertip inside every widget.
+
+        points is an (N, 2) pixel array; edges count as inside.
+        """
+        points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        empty = np.zeros(0, dtype=np.intp)
+        if len(points) == 0 or len(self.widgets) == 0:
+            return empty, empty
+
+        col = np.clip(points[:, 0], 0, None) // self.cell_size
+        row = np.clip(points[:, 1], 0, None) // self.cell_size
+        in_grid = (col < self.cols) & (row < self.rows)
+        cell = np.where(in_grid, row * self.cols + col, 0)
+        starts = self.cell_start[cell]
+        counts = np.where(in_grid, self.cell_start[cell + 1] - starts, 0)
+
+        # Expand every point into (point, candidate widget) pairs
+        point_idx = np.repeat(np.arange(len(points)), counts)
+        if len(point_idx) == 0:
+            return empty, empty
+        offsets = np.arange(len(point_idx)) - np.repeat(np.cumsum(counts) - counts, counts)
+        widget_idx = self.cell_items[np.repeat(starts, counts) + offsets]
+
+        x, y = points[point_idx, 0], points[point_idx, 1]
+        box = self.bboxes[widget_idx]
+        inside = (box[:, 0] <= x) & (x <= box[:, 2]) & (box[:, 1] <= y) & (y <= box[:, 3])
+        circle = self.shapes[widget_idx] == CIRCLE
+        if circle.any():
+            d = points[point_idx] - self.centers[widget_idx]
+            inside &= ~circle | ((d ** 2).sum(axis=1) <= self.radii_sq[widget_idx])
+        return point_idx[inside], widget_idx[inside]
+
+
+class TouchTracker:
+    """Turns per-frame widget hits into enter/dwell/exit events.
+
+    A widget is entered the first frame a fingertip is inside it, fires a
+    single "dwell" event (the press) once it has been held for the widget's
+    dwell time, and exits only after release_frames frames without a touch,
+    so a flickering fingertip doesn't press it again.
+    """
+
+    def __init__(self, registry, release_frames=3):
+        self.registry = registry
+        self.release_frames = release_frames
+        self.states = {}
+
+    def update(self, touches, now):
+        """touches maps widget_idx to (hand_idx, (x, y)); returns this frame's events"""
+        events = []
+        for widget_idx, (hand_idx, position) in touches.items():
+            state = self.states.get(widget_idx)
+            widget = self.registry.widgets[widget_idx]
+            if state is None:
+                state = self.states[widget_idx] = {"since": now, "pressed": False, "missed": 0}
+                events.append(self._event("enter", widget, hand_idx, position, now))
+            state["missed"] = 0
+            state["hand"], state["position"] = hand_idx, position
+            if not state["pressed"] and now - state["since"] >= widget.dwell:
+                state["pressed"] = True
+                events.append(self._event("dwell", widget, hand_idx, position, now))
+
+        for widget_idx in list(self.states):
+            if widget_idx in touches:
+                continue
+            state = self.states[widget_idx]
+            state["missed"] += 1
+            if state["missed"] >= self.release_frames:
+                del self.states[widget_idx]
+                widget = self.registry.widgets[widget_idx]
+                events.append(self._event("exit", widget, state["hand"], state["position"], now,
+                                          pressed=state["pressed"]))
+        return events
+
+    def reset(self, now):
+        """Exit every widget, e.g. when the buttons are hidden"""
+        events = [
+            self._event("exit", self.registry.widgets[widget_idx], state["hand"], state["position"], now,
+                        pressed=state["pressed"])
+            for widget_idx, state in self.states.items()
+        ]
+        self.states.clear()
+        return events
+
+    @staticmethod
+    def _event(kind, widget, hand_idx, position, now, **extra):
+        return {"type": kind, "widget": widget.name, "hand_idx": int(hand_idx),
+                "position": list(position), "time": now, **extra}